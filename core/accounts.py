@@ -0,0 +1,109 @@
+"""
+Account deletion without one giant cascade.
+
+Deleting a User through the ORM collects every question, answer and bookmark
+it owns, plus everything pointing at those, in a single transaction. For a
+prolific account that times out the request and holds locks on all of it.
+
+Instead, a deletion request only deactivates the account, revokes its
+tokens and queues a job. purge_account() then removes the content in
+transactions of at most
+ACCOUNT_PURGE_BATCH_SIZE rows, leaf tables first: by the time a question is
+deleted its answers and bookmarks are gone, so each cascade check finds
+nothing and each DELETE stays bounded.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .duplicates import get_index
+from .jobs import job
+from .models import AccountDeletion, Answer, Bookmark, Question, User
+
+# AccountDeletion counter for each model the batches delete from
+_COUNTERS = {
+    Question._meta.label: "questions_deleted",
+    Answer._meta.label: "answers_deleted",
+    Bookmark._meta.label: "bookmarks_deleted",
+}
+
+
+def request_deletion(user):
+    """Deactivate ``user`` now and queue a job to purge their content."""
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        Token.objects.filter(user=user).delete()
+        deletion, _ = AccountDeletion.objects.get_or_create(
+            user=user, defaults={"username": user.username}
+        )
+        purge_deleted_account.delay(deletion_id=deletion.pk)
+    return deletion
+
+
+def _delete_in_batches(deletion, queryset, batch_size):
+    while True:
+        with transaction.atomic():
+            ids = list(
+                queryset.order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            _, counts = queryset.model.objects.filter(pk__in=ids).delete()
+            updates = {
+                field: F(field) + counts[label]
+                for label, field in _COUNTERS.items()
+                if counts.get(label)
+            }
+            AccountDeletion.objects.filter(pk=deletion.pk).update(**updates)
+            if queryset.model is Question:
+                index = get_index()
+                transaction.on_commit(lambda ids=ids: [index.remove(pk) for pk in ids])
+        yield len(ids)
+
+
+def purge_account(deletion, batch_size=None, progress=None):
+    """
+    Delete everything belonging to ``deletion.user``, then the user. Safe to
+    rerun after an interruption; ``progress`` is called with the refreshed
+    AccountDeletion after every batch.
+    """
+    batch_size = batch_size or settings.ACCOUNT_PURGE_BATCH_SIZE
+    user_id = deletion.user_id
+    if user_id is not None:
+        steps = [
+            Bookmark.objects.filter(user_id=user_id),
+            # bookmarks other users made of these answers go with them
+            Answer.objects.filter(author_id=user_id),
+            # other users' answers to this user's questions
+            Answer.objects.filter(question__author_id=user_id),
+            Question.objects.filter(author_id=user_id),
+        ]
+        for queryset in steps:
+            for _ in _delete_in_batches(deletion, queryset, batch_size):
+                if progress:
+                    deletion.refresh_from_db()
+                    progress(deletion)
+        User.objects.filter(pk=user_id).delete()
+
+    AccountDeletion.objects.filter(pk=deletion.pk).update(completed_at=timezone.now())
+    deletion.refresh_from_db()
+    return deletion
+
+
+@job
+def purge_deleted_account(deletion_id):
+    deletion = AccountDeletion.objects.get(pk=deletion_id)
+    if deletion.completed_at is None:
+        purge_account(deletion)
+
+
+def purge_pending(batch_size=None, progress=None):
+    """Purge every account whose deletion hasn't completed, oldest first."""
+    pending = AccountDeletion.objects.filter(completed_at__isnull=True)
+    return [
+        purge_account(deletion, batch_size, progress)
+        for deletion in pending.order_by("requested_at")
+    ]
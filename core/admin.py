@@ -1,8 +1,67 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Question, Answer, Bookmark
+from .models import User, Question, Answer, Bookmark, AccountDeletion, Job
+from .pagination import EstimatedCountPaginator
 
-admin.site.register(User, UserAdmin)
-admin.site.register(Question)
-admin.site.register(Answer)
-admin.site.register(Bookmark)
+# Every search field is a case-sensitive prefix match on an indexed column, so
+# searching uses the index instead of scanning the table. Related objects are
+# picked with autocomplete or raw id widgets rather than a <select> of every row.
+
+
+class EstimatedCountAdmin(admin.ModelAdmin):
+    """Count large changelists from planner estimates, and skip the unfiltered total."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(User)
+class ScalableUserAdmin(EstimatedCountAdmin, UserAdmin):
+    search_fields = ["username__startswith"]
+
+
+@admin.register(Question)
+class QuestionAdmin(EstimatedCountAdmin):
+    list_display = ["title", "author", "created_at"]
+    list_select_related = ["author"]
+    search_fields = ["title__startswith"]
+    autocomplete_fields = ["author"]
+    date_hierarchy = "created_at"
+
+
+@admin.register(Answer)
+class AnswerAdmin(EstimatedCountAdmin):
+    list_display = ["id", "author", "question", "accepted", "created_at"]
+    list_select_related = ["author", "question"]
+    search_fields = ["author__username__startswith"]
+    autocomplete_fields = ["author", "question"]
+    date_hierarchy = "created_at"
+
+
+@admin.register(Bookmark)
+class BookmarkAdmin(EstimatedCountAdmin):
+    list_display = ["id", "user", "question", "answer", "created_at"]
+    list_select_related = ["user", "question", "answer"]
+    search_fields = ["user__username__startswith"]
+    autocomplete_fields = ["user", "question"]
+    raw_id_fields = ["answer"]
+    date_hierarchy = "created_at"
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(EstimatedCountAdmin):
+    list_display = [
+        "username",
+        "requested_at",
+        "completed_at",
+        "questions_deleted",
+        "answers_deleted",
+        "bookmarks_deleted",
+    ]
+    raw_id_fields = ["user"]
+
+
+@admin.register(Job)
+class JobAdmin(EstimatedCountAdmin):
+    list_display = ["name", "status", "attempts", "run_after", "finished_at"]
+    list_filter = ["status"]
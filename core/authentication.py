@@ -0,0 +1,26 @@
+"""
+Token authentication that knows about POST /batch.
+
+BatchView runs each of its sub-requests through the sub-request's own view,
+which authenticates it again. The batch has already been authenticated, so
+its sub-requests reuse that result instead of looking the token up once per
+sub-request.
+"""
+
+from rest_framework import authentication
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+    """
+    DRF's token authentication, except that a sub-request of a batch is
+    authenticated as the batch was. BatchView sets ``batch`` on the
+    sub-request to the batch's DRF request.
+    """
+
+    def authenticate(self, request):
+        batch = getattr(request, "batch", None)
+        if batch is None:
+            return super().authenticate(request)
+        if batch.user.is_authenticated:
+            return batch.user, batch.auth
+        return None
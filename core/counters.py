@@ -0,0 +1,169 @@
+"""
+Write-behind view counters and the materialized "hot questions" ranking.
+
+Views are counted in process memory. A background thread in each process
+writes them to QuestionStats as one multi-row upsert every
+VIEW_COUNTER_FLUSH_INTERVAL seconds, or as soon as VIEW_COUNTER_FLUSH_SIZE
+views are pending, so a crash loses at most that many views per worker and
+requests never wait on the write.
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .jobs import job
+from .models import Question, QuestionStats
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_stats(views=None, hot_scores=None):
+    """
+    Add ``views`` ({question_id: count}) to the stored view counts, or replace
+    the stored hot scores with ``hot_scores`` ({question_id: score}), in one
+    statement. Ids of questions deleted in the meantime are skipped.
+    """
+    if views:
+        values, column, update = views, "views", "{table}.views + excluded.views"
+    elif hot_scores:
+        values, column, update = hot_scores, "hot_score", "excluded.hot_score"
+    else:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(QuestionStats._meta.db_table)
+    selected = {"views": "0", "hot_score": "0"}
+    cases = " ".join("WHEN %s THEN %s" for _ in values)
+    selected[column] = f"CASE id {cases} END"
+    sql = (
+        f"INSERT INTO {table} (question_id, views, hot_score) "
+        f"SELECT id, {selected['views']}, {selected['hot_score']} "
+        f"FROM {quote(Question._meta.db_table)} "
+        f"WHERE id IN ({', '.join('%s' for _ in values)}) "
+        f"ON CONFLICT (question_id) "
+        f"DO UPDATE SET {column} = {update.format(table=table)}"
+    )
+    params = [item for pair in values.items() for item in pair] + list(values)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def hot_score(views, answers, created_at, now):
+    """Activity decayed by age, so new questions can outrank old popular ones."""
+    age_hours = max((now - created_at).total_seconds() / 3600, 0)
+    activity = math.log10(views + 1) + 2 * answers + 1
+    return activity / (age_hours + 2) ** settings.HOT_QUESTIONS_GRAVITY
+
+
+@job(max_attempts=1)
+def refresh_hot_scores():
+    """
+    Recompute hot scores for questions inside HOT_QUESTIONS_WINDOW and zero
+    out the ones that have aged out of it.
+    """
+    now = timezone.now()
+    cutoff = now - settings.HOT_QUESTIONS_WINDOW
+    rows = (
+        Question.objects.filter(created_at__gte=cutoff)
+        .annotate(answer_count=Count("answers"))
+        .values_list("id", "created_at", "answer_count", "stats__views")
+    )
+    scores = {
+        pk: hot_score(views or 0, answers, created_at, now)
+        for pk, created_at, answers, views in rows
+    }
+    with transaction.atomic():
+        QuestionStats.objects.filter(hot_score__gt=0).exclude(
+            question__created_at__gte=cutoff
+        ).update(hot_score=0)
+        upsert_stats(hot_scores=scores)
+    return len(scores)
+
+
+def hot_questions(queryset):
+    """The top of the last materialized ranking."""
+    queryset = queryset.filter(stats__hot_score__gt=0)
+    queryset = queryset.order_by("-stats__hot_score", "-stats__question")
+    return queryset[: settings.HOT_QUESTIONS_LIMIT]
+
+
+class ViewCounter:
+    def __init__(self, flush_size, flush_interval):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._full = threading.Event()
+        self._flusher_pid = None
+
+    def record(self, question_id):
+        with self._lock:
+            self._pending[question_id] += 1
+            full = self._pending.total() >= self.flush_size
+        self.start()
+        if full:
+            self._full.set()
+
+    def start(self):
+        """Start this process's flushing thread, unless it's running already."""
+        # compared by pid, since threads don't survive gunicorn forking workers
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self.run, name="view-counter", daemon=True).start()
+
+    def run(self):
+        while True:
+            self._full.wait(self.flush_interval)
+            self._full.clear()
+            try:
+                self.flush()
+            except Exception:
+                # keep the thread alive for the next batch
+                logger.exception("Could not flush question views")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+        if not batch:
+            return
+        try:
+            upsert_stats(views=batch)
+        except Exception:
+            logger.exception("Could not flush %d question views", batch.total())
+            with self._lock:
+                # retry with the next flush, holding at most ten batches' worth
+                if self._pending.total() + batch.total() <= self.flush_size * 10:
+                    self._pending.update(batch)
+            return
+
+        # queue a refresh of the ranking every HOT_QUESTIONS_REFRESH_INTERVAL,
+        # from whichever web worker gets there first
+        interval = settings.HOT_QUESTIONS_REFRESH_INTERVAL.total_seconds()
+        if cache.add("hot-questions-refresh", True, interval):
+            try:
+                refresh_hot_scores.delay()
+            except Exception:
+                logger.exception("Could not queue a hot questions refresh")
+
+
+view_counter = ViewCounter(
+    flush_size=settings.VIEW_COUNTER_FLUSH_SIZE,
+    flush_interval=settings.VIEW_COUNTER_FLUSH_INTERVAL,
+)
+atexit.register(view_counter.flush)
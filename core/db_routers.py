@@ -0,0 +1,44 @@
+"""
+Route reads to a replica database when one is configured.
+
+``ReplicaRoutingMiddleware`` decides per request whether reads may go to the
+replica: only read-only requests may, so a request that writes also reads
+from the primary and sees its own writes. Writes always go to the primary.
+"""
+
+from contextvars import ContextVar
+
+from django.db import connections
+
+REPLICA = "replica"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def use_replica(enabled):
+    """Allow or forbid replica reads for the current context. Returns a token for ``reset_replica``."""
+    return _use_replica.set(enabled)
+
+
+def reset_replica(token):
+    _use_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _use_replica.get()
+            and REPLICA in connections.settings
+            and not connections["default"].in_atomic_block
+        ):
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
@@ -0,0 +1,292 @@
+"""
+Near-duplicate question detection with MinHash signatures and an LSH index.
+
+Each question's title and body are reduced to a fixed-size MinHash signature.
+Signatures are split into bands; questions sharing any band land in the same
+bucket, so a lookup only compares against bucket-mates instead of the table.
+
+The index lives in memory and is persisted as an append-only file of
+fixed-size records. Every worker process tails that file, so additions made
+by one worker become visible to the others without a reload. Once superseded
+records and deletions make up most of the file, it is compacted: rewritten
+from the live entries and swapped in, which readers notice as a new inode.
+Appends share, and rewrites hold exclusively, a lock on ``<path>.lock``, so
+no append can land in a file that is being replaced.
+"""
+
+import fcntl
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .models import Question
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# compact once the file holds this many records and twice the live entries
+COMPACT_MIN_RECORDS = 1000
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MASK32 = (1 << 32) - 1
+# Fixed seeds so signatures stay comparable across processes and restarts.
+_PERMUTATIONS = [
+    (
+        zlib.crc32(f"a{i}".encode()) * 2654435761 % _MERSENNE_PRIME or 1,
+        zlib.crc32(f"b{i}".encode()) * 40503 % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+_RECORD = struct.Struct(f"<q?{NUM_PERM}I")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def shingles(text):
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return set(tokens)
+    return {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(title, body=""):
+    hashes = [zlib.crc32(s.encode()) for s in shingles(f"{title} {body or ''}")]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MASK32
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a, sig_b):
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class DuplicateIndex:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.signatures = {}
+        self.buckets = [defaultdict(set) for _ in range(BANDS)]
+        self._offset = 0
+        self._inode = None
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _bands(self, sig):
+        return [sig[i * ROWS : (i + 1) * ROWS] for i in range(BANDS)]
+
+    def _insert(self, pk, sig):
+        self._discard(pk)
+        self.signatures[pk] = sig
+        for bucket, band in zip(self.buckets, self._bands(sig)):
+            bucket[band].add(pk)
+
+    def _discard(self, pk):
+        sig = self.signatures.pop(pk, None)
+        if sig is None:
+            return
+        for bucket, band in zip(self.buckets, self._bands(sig)):
+            members = bucket[band]
+            members.discard(pk)
+            if not members:
+                del bucket[band]
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            # closing the descriptor releases the lock
+            os.close(fd)
+
+    def _append(self, pk, sig):
+        if self.path is None:
+            return
+        record = _RECORD.pack(pk, sig is None, *(sig or (0,) * NUM_PERM))
+        with self._file_lock(exclusive=False):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, record)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        if size // _RECORD.size > max(COMPACT_MIN_RECORDS, 2 * len(self.signatures)):
+            with self._file_lock(exclusive=True):
+                self._sync()
+                self._write()
+
+    def _write(self):
+        """Replace the file with the live entries. Hold the exclusive lock."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(
+                b"".join(
+                    _RECORD.pack(pk, False, *sig) for pk, sig in self.signatures.items()
+                )
+            )
+        os.replace(tmp_path, self.path)
+        stat = os.stat(self.path)
+        self._inode, self._offset = stat.st_ino, stat.st_size
+
+    def _apply(self, data):
+        """Apply the whole records in ``data``; returns the bytes they used."""
+        usable = len(data) - len(data) % _RECORD.size
+        for values in _RECORD.iter_unpack(data[:usable]):
+            pk, deleted, sig = values[0], values[1], values[2:]
+            if deleted:
+                self._discard(pk)
+            else:
+                self._insert(pk, sig)
+        return usable
+
+    def _file_end(self):
+        """(inode, size) of the file, or None if there's none yet."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def _sync(self):
+        """Pick up records appended by other processes, or a rewritten file."""
+        if self.path is None:
+            return
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset()
+            return
+        with f:
+            # stat what was opened, in case the file was swapped in between
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset()
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+        self._offset += self._apply(data)
+
+    def add(self, pk, title, body=""):
+        sig = signature(title, body)
+        with self._lock:
+            self._sync()
+            if sig is None:
+                self._discard(pk)
+            else:
+                self._insert(pk, sig)
+            self._append(pk, sig)
+
+    def remove(self, pk):
+        with self._lock:
+            self._sync()
+            self._discard(pk)
+            self._append(pk, None)
+
+    def query(self, title, body="", exclude=None, threshold=None, limit=None):
+        """
+        Return (pk, similarity) pairs for indexed questions that look like a
+        near-duplicate of the given text, most similar first.
+        """
+        if threshold is None:
+            threshold = settings.DUPLICATE_THRESHOLD
+        if limit is None:
+            limit = settings.DUPLICATE_MAX_RESULTS
+        sig = signature(title, body)
+        if sig is None:
+            return []
+        with self._lock:
+            self._sync()
+            candidates = set()
+            for bucket, band in zip(self.buckets, self._bands(sig)):
+                candidates |= bucket.get(band, set())
+            candidates.discard(exclude)
+            scored = [(pk, similarity(sig, self.signatures[pk])) for pk in candidates]
+        scored = [(pk, score) for pk, score in scored if score >= threshold]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def rebuild(self, rows):
+        """
+        Replace the index with ``rows`` of (pk, title, body). The new file is
+        written beside the old one and swapped in atomically, so other
+        processes reload it on their next lookup. Records appended while
+        ``rows`` was being read are carried over into the new file.
+        """
+        start = None
+        if self.path is not None:
+            with self._file_lock(exclusive=True):
+                start = self._file_end()
+        signatures = {}
+        for pk, title, body in rows:
+            sig = signature(title, body)
+            if sig is not None:
+                signatures[pk] = sig
+
+        with self._lock:
+            self._reset()
+            for pk, sig in signatures.items():
+                self._insert(pk, sig)
+            if self.path is None:
+                return
+            with self._file_lock(exclusive=True):
+                end = self._file_end()
+                if end is not None:
+                    # all of it, if another process compacted it meanwhile
+                    same_file = start is not None and end[0] == start[0]
+                    with open(self.path, "rb") as f:
+                        f.seek(start[1] if same_file else 0)
+                        self._apply(f.read())
+                self._write()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DuplicateIndex(settings.DUPLICATE_INDEX_PATH)
+    return _index
+
+
+def find_duplicates(title, body="", exclude=None):
+    """
+    Look up near-duplicates of a question's text. Matches are resolved by
+    primary key, so entries for deleted questions simply drop out.
+    """
+    matches = get_index().query(title, body, exclude=exclude)
+    if not matches:
+        return []
+    titles = dict(
+        Question.objects.filter(pk__in=[pk for pk, _ in matches]).values_list(
+            "id", "title"
+        )
+    )
+    return [
+        {"id": pk, "title": titles[pk], "similarity": round(score, 2)}
+        for pk, score in matches
+        if pk in titles
+    ]
@@ -0,0 +1,42 @@
+"""
+Outgoing email through the job queue, so activation and password-reset
+requests don't wait on the mail server. QUEUED_EMAIL_BACKEND does the actual
+sending, in the worker.
+"""
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .jobs import job
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if message.attachments:
+                raise ValueError("Queued email doesn't support attachments")
+            send_email.delay(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                to=message.to,
+                cc=message.cc,
+                bcc=message.bcc,
+                reply_to=message.reply_to,
+                headers=message.extra_headers,
+                alternatives=[
+                    list(alt) for alt in getattr(message, "alternatives", [])
+                ],
+            )
+        return len(email_messages)
+
+
+@job
+def send_email(alternatives=(), **fields):
+    message = EmailMultiAlternatives(
+        connection=get_connection(settings.QUEUED_EMAIL_BACKEND), **fields
+    )
+    for content, mimetype in alternatives:
+        message.attach_alternative(content, mimetype)
+    message.send()
@@ -0,0 +1,146 @@
+"""
+A values()-based read path for the question and answer lists.
+
+QuestionSerializer and AnswerSerializer build a model instance for every row
+and run every value through a DRF field object. On large lists that CPU time
+dominates the response. The row serializers here fetch plain tuples instead
+and assemble the same JSON shape directly, in the same number of queries.
+Views use them when FAST_LIST_SERIALIZATION is on. core.tests.test_fast_lists
+checks that both paths return identical responses.
+"""
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from taggit.models import TaggedItem
+
+from .markdown import stored_html
+from .media import photo_urls
+from .models import Answer, Question, User
+
+AUTHOR_FIELDS = ("author_id", "author__username", "author__photo")
+
+
+class Authors:
+    """UserNestedSerializer output, built once per author per response."""
+
+    storage = User._meta.get_field("photo").storage
+
+    def __init__(self, request=None):
+        self.request = request
+        self.built = {}
+
+    def __call__(self, pk, username, photo):
+        author = self.built.get(pk)
+        if author is None:
+            url = None
+            if photo:
+                url = photo_urls.url(pk, photo, self.storage)
+                if self.request is not None:
+                    url = self.request.build_absolute_uri(url)
+            author = {"id": pk, "username": username, "photo": url}
+            self.built[pk] = author
+        return author
+
+
+class RowSerializer(ABC):
+    """
+    ``values()`` selects the columns of a queryset as tuples, which can be
+    sliced or paginated like the queryset; ``build()`` turns fetched tuples
+    into response data. With ``html``, the Markdown in ``markdown_field`` is
+    returned as its stored HTML rendering, like MarkdownField does.
+    """
+
+    fields = ()
+    markdown_field = None
+
+    def __init__(self, html=False):
+        self.html = html
+
+    def values(self, queryset):
+        columns = [self.markdown_field]
+        if self.html:
+            columns += [
+                f"{self.markdown_field}_html",
+                f"{self.markdown_field}_html_version",
+            ]
+        # the Markdown columns come last in each tuple; see markdown()
+        return queryset.prefetch_related(None).values_list(*self.fields, *columns)
+
+    def markdown(self, columns):
+        return stored_html(*columns) if self.html else columns[0]
+
+    @abstractmethod
+    def build(self, rows, request=None):
+        """Response data for ``rows`` fetched from ``values()``."""
+
+
+class AnswerRows(RowSerializer):
+    """Rows shaped like AnswerSerializer."""
+
+    fields = ("id", "accepted", "question_id", *AUTHOR_FIELDS)
+    markdown_field = "text"
+
+    def build(self, rows, request=None, authors=None):
+        author = authors or Authors(request)
+        return [
+            {
+                "id": pk,
+                "text": self.markdown(text),
+                "author": author(author_id, username, photo),
+                "accepted": accepted,
+                "question": question_id,
+            }
+            for pk, accepted, question_id, author_id, username, photo, *text in rows
+        ]
+
+
+class QuestionRows(RowSerializer):
+    """Rows shaped like QuestionSerializer, with tags and answers."""
+
+    fields = ("id", "title", *AUTHOR_FIELDS)
+    markdown_field = "body"
+
+    def __init__(self, html=False):
+        super().__init__(html)
+        self.answer_rows = AnswerRows(html)
+
+    def build(self, rows, request=None):
+        rows = list(rows)
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        author = Authors(request)
+
+        tags = defaultdict(list)
+        tagged = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Question),
+            object_id__in=ids,
+        )
+        for object_id, name in tagged.values_list("object_id", "tag__name"):
+            tags[object_id].append(name)
+        # in alphabetical order, like SortedTagListField
+        for names in tags.values():
+            names.sort()
+
+        answers = defaultdict(list)
+        answer_values = self.answer_rows.values(
+            Answer.objects.filter(question_id__in=ids).order_by(
+                "question_id", *Answer.THREAD_ORDER
+            )
+        )
+        for answer in self.answer_rows.build(answer_values, authors=author):
+            answers[answer["question"]].append(answer)
+
+        return [
+            {
+                "id": pk,
+                "title": title,
+                "body": self.markdown(body),
+                "author": author(author_id, username, photo),
+                "tags": tags[pk],
+                "answers": answers[pk],
+            }
+            for pk, title, author_id, username, photo, *body in rows
+        ]
@@ -0,0 +1,119 @@
+"""
+A small database-backed job queue for work that shouldn't hold up a request.
+
+Functions decorated with @job can be queued with ``func.delay(**kwargs)``.
+The job row is written when the current transaction commits, so a worker
+never picks up a job for data that was rolled back. ``manage.py run_worker``
+claims due jobs and runs them in a thread or process pool. A job that raises
+is retried with exponential backoff, up to its ``max_attempts``.
+
+Arguments are stored as JSON, so pass ids rather than model instances.
+"""
+
+import functools
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def job(func=None, *, max_attempts=None):
+    """Register ``func`` as a job and give it a ``delay(**kwargs)`` method."""
+    if func is None:
+        return functools.partial(job, max_attempts=max_attempts)
+
+    func.job_name = f"{func.__module__}.{func.__qualname__}"
+    func.max_attempts = max_attempts or settings.JOBS_MAX_ATTEMPTS
+    func.delay = functools.partial(enqueue, func)
+    return func
+
+
+def enqueue(func, **kwargs):
+    """Queue ``func(**kwargs)`` once the current transaction commits."""
+
+    def create():
+        Job.objects.create(
+            name=func.job_name,
+            kwargs=kwargs,
+            max_attempts=func.max_attempts,
+            run_after=timezone.now(),
+        )
+
+    transaction.on_commit(create)
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next try, doubling after each failure."""
+    return settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def requeue_stale():
+    """
+    Put back jobs whose worker died mid-run. A job counts as abandoned once
+    it has been running for JOBS_STALE_AFTER.
+    """
+    cutoff = timezone.now() - settings.JOBS_STALE_AFTER
+    return Job.objects.filter(status=Job.RUNNING, started_at__lt=cutoff).update(
+        status=Job.QUEUED
+    )
+
+
+def claim(limit):
+    """
+    Mark up to ``limit`` due jobs as running and return their ids. Workers
+    skip each other's locked rows where the database supports it. The
+    conditional update keeps claims exclusive everywhere else.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.order_by("run_after", "id").values_list("id", flat=True)[:limit])
+        return [
+            pk
+            for pk in ids
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, started_at=now, attempts=F("attempts") + 1
+            )
+        ]
+
+
+def run(pk):
+    """Run a claimed job and record its outcome."""
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=pk)
+        try:
+            func = import_string(job.name)
+            if getattr(func, "job_name", None) != job.name:
+                raise ImportError(f"{job.name} is not a registered job")
+            func(**job.kwargs)
+        except Exception:
+            error = traceback.format_exc()
+            if job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                logger.warning("Job %s failed, retrying in %ss", job, delay)
+                job.status = Job.QUEUED
+                job.run_after = timezone.now() + timedelta(seconds=delay)
+            else:
+                logger.error("Job %s failed for good:\n%s", job, error)
+                job.status = Job.FAILED
+                job.finished_at = timezone.now()
+            job.last_error = error
+        else:
+            job.status = Job.DONE
+            job.finished_at = timezone.now()
+        job.save(update_fields=["status", "run_after", "finished_at", "last_error"])
+        return job.status
+    finally:
+        close_old_connections()
@@ -0,0 +1,59 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.duplicates import DuplicateIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark near-duplicate lookup latency against corpus size, "
+        "using a synthetic in-memory corpus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", nargs="+", type=int, default=[1_000, 10_000, 50_000]
+        )
+        parser.add_argument("--lookups", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        vocabulary = [f"word{i}" for i in range(5_000)]
+
+        def document():
+            return (
+                " ".join(rng.choices(vocabulary, k=8)),
+                " ".join(rng.choices(vocabulary, k=40)),
+            )
+
+        self.stdout.write(
+            f"{'corpus':>8} {'build s':>9} {'p50 ms':>8} {'p95 ms':>8} {'hits':>6}"
+        )
+        for size in options["sizes"]:
+            corpus = [document() for _ in range(size)]
+            index = DuplicateIndex()
+            start = time.perf_counter()
+            index.rebuild((pk, title, body) for pk, (title, body) in enumerate(corpus))
+            build = time.perf_counter() - start
+
+            timings, hits = [], 0
+            for _ in range(options["lookups"]):
+                title, body = rng.choice(corpus)
+                # lightly edited copy of an existing question
+                words = body.split()
+                words[rng.randrange(len(words))] = rng.choice(vocabulary)
+                start = time.perf_counter()
+                hits += bool(
+                    index.query(title, " ".join(words), threshold=0.5, limit=5)
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            self.stdout.write(
+                f"{size:>8} {build:>9.2f} {statistics.median(timings):>8.3f} "
+                f"{p95:>8.3f} {hits:>6}"
+            )
@@ -0,0 +1,94 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test import RequestFactory
+
+from core.fast_lists import AnswerRows, QuestionRows
+from core.models import Answer, Question
+from core.seeding import seed
+from core.serializers import AnswerSerializer, QuestionSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the serializer and values() list paths on seeded data: time "
+        "to fetch and build one list response, and rows per second for a "
+        "single worker. Seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=2000)
+        parser.add_argument("--answers", type=int, default=5)
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Questions per measured list (the full table with 0).",
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed(
+                users=max(options["questions"] // 20, 1),
+                questions=options["questions"],
+                answers_per_question=options["answers"],
+            )
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        request = RequestFactory().get("/questions")
+        questions = Question.objects.order_by("id")
+        answers = Answer.objects.order_by("id")
+        if options["page_size"]:
+            questions = questions[: options["page_size"]]
+            answers = answers[: options["page_size"] * options["answers"]]
+        prefetched = questions.select_related("author").prefetch_related(
+            "tags",
+            Prefetch(
+                "answers", queryset=answers.model.objects.select_related("author")
+            ),
+        )
+        context = {"request": request}
+        cases = [
+            (
+                "questions",
+                lambda: QuestionSerializer(
+                    prefetched.all(), many=True, context=context
+                ).data,
+                lambda: QuestionRows().build(QuestionRows().values(questions), request),
+            ),
+            (
+                "answers",
+                lambda: AnswerSerializer(
+                    answers.select_related("author"), many=True, context=context
+                ).data,
+                lambda: AnswerRows().build(AnswerRows().values(answers), request),
+            ),
+        ]
+
+        self.stdout.write(
+            f"{'list':<10} {'path':<11} {'rows':>6} {'ms':>9} {'rows/s':>10} {'speedup':>8}"
+        )
+        for name, slow, fast in cases:
+            baseline = None
+            for path, build in [("serializer", slow), ("values", fast)]:
+                rows = len(build())
+                timings = []
+                for _ in range(options["repeat"]):
+                    start = time.perf_counter()
+                    build()
+                    timings.append(time.perf_counter() - start)
+                elapsed = statistics.median(timings)
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"{name:<10} {path:<11} {rows:>6} {elapsed * 1000:>9.1f} "
+                    f"{rows / elapsed:>10.0f} {baseline / elapsed:>7.1f}x"
+                )
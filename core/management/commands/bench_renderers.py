@@ -0,0 +1,90 @@
+import gzip
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Question
+from core.renderers import ORJSONRenderer, MessagePackRenderer, msgpack, orjson
+from core.serializers import QuestionSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering time and bytes on the wire for the question list, "
+        "across renderers and compression schemes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Serialize the questions in the database instead of a synthetic list.",
+        )
+        parser.add_argument("--questions", type=int, default=500)
+        parser.add_argument("--answers", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def synthetic_payload(self, questions, answers):
+        def author(pk):
+            return {
+                "id": pk,
+                "username": f"user{pk}",
+                "photo": f"https://example.com/media/user_profile_photos/{pk}.jpg",
+            }
+
+        return [
+            {
+                "id": q,
+                "title": f"How do I do thing number {q} in Django?",
+                "body": "I tried a few things and none of them worked. " * 8,
+                "author": author(q % 97),
+                "tags": ["django", "python", f"tag{q % 13}"],
+                "answers": [
+                    {
+                        "id": q * answers + a,
+                        "text": "Have you tried turning it off and on again? " * 4,
+                        "author": author(a % 89),
+                        "accepted": a == 0 or None,
+                        "question": q,
+                    }
+                    for a in range(answers)
+                ],
+            }
+            for q in range(questions)
+        ]
+
+    def handle(self, *args, **options):
+        if options["from_db"]:
+            data = QuestionSerializer(Question.objects.all(), many=True).data
+        else:
+            data = self.synthetic_payload(options["questions"], options["answers"])
+
+        renderers = [("json (stdlib)", JSONRenderer())]
+        if orjson is not None:
+            renderers.append(("orjson", ORJSONRenderer()))
+        if msgpack is not None:
+            renderers.append(("msgpack", MessagePackRenderer()))
+
+        self.stdout.write(
+            f"{'renderer':<14} {'render ms':>10} {'raw KB':>9} {'gzip KB':>9} {'br KB':>9}"
+        )
+        for name, renderer in renderers:
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                body = renderer.render(data, renderer.media_type, {})
+                timings.append((time.perf_counter() - start) * 1000)
+            gzipped = len(gzip.compress(body, compresslevel=6, mtime=0))
+            brotlied = len(brotli.compress(body, quality=5)) if brotli else None
+            self.stdout.write(
+                f"{name:<14} {statistics.median(timings):>10.2f} "
+                f"{len(body) / 1024:>9.1f} {gzipped / 1024:>9.1f} "
+                + (f"{brotlied / 1024:>9.1f}" if brotlied else f"{'n/a':>9}")
+            )
@@ -0,0 +1,79 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Question
+from core.search import SubstringSearchBackend, get_search_backend
+from core.seeding import seed
+
+# common words match most seeded questions; "kubernetes" matches none
+SEARCHES = [
+    "django",
+    "cache memory",
+    "postgres index query",
+    "thread process speed",
+    "kubernetes",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ?search= on seeded questions with the search backend for this "
+        "database, against unindexed substring matching. Run it on each "
+        "database to compare backends. Seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=100000)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--skip-baseline",
+            action="store_true",
+            help="Don't time substring matching, which scans every question.",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            start = time.perf_counter()
+            seed(
+                users=max(options["questions"] // 100, 1),
+                questions=options["questions"],
+                answers_per_question=0,
+            )
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            self.stdout.write(
+                f"Seeded and indexed {options['questions']} questions in "
+                f"{time.perf_counter() - start:.1f} s with {type(backend).__name__}\n"
+            )
+
+            engines = [("index", lambda qs, text: backend.search(qs, text))]
+            if not options["skip_baseline"]:
+                engines.append(("substring", SubstringSearchBackend().search))
+
+            self.stdout.write(
+                f"{'search':<24} {'engine':<10} {'matches':>8} {'median ms':>10} {'max ms':>8}"
+            )
+            for text in SEARCHES:
+                for name, search in engines:
+                    matches, timings = self.measure(search, text, options)
+                    self.stdout.write(
+                        f"{text:<24} {name:<10} {matches:>8} "
+                        f"{statistics.median(timings):>10.1f} {max(timings):>8.1f}"
+                    )
+            transaction.set_rollback(True)
+
+    def measure(self, search, text, options):
+        """Time one page of results plus the total count, like a paginated request."""
+        timings = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            queryset = search(Question.objects.order_by("id"), text)
+            matches = queryset.count()
+            list(queryset.values_list("id", flat=True)[: options["page_size"]])
+            timings.append((time.perf_counter() - start) * 1000)
+        return matches, timings
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import build_artifacts
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema as static, precompressed artifacts "
+        "served at /schema/."
+    )
+
+    def handle(self, *args, **options):
+        directory = settings.SCHEMA_ARTIFACT_DIR
+        manifest = build_artifacts(directory)
+        for fmt, version in manifest.items():
+            self.stdout.write(f"schema.{fmt} version {version}")
+        self.stdout.write(self.style.SUCCESS(f"Schema written to {directory}"))
@@ -0,0 +1,280 @@
+import json
+import re
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Answer, Question, User
+from core.seeding import seed
+
+# Sorts the audit knows about and accepts, matched against the statement.
+EXPECTED_SORTS = [
+    (
+        re.compile(r'AS "search_rank"'),
+        "search results are ordered by a relevance score computed per search",
+    ),
+    (
+        re.compile(r'"_prefetch_related_val"'),
+        "taggit's tag prefetch deduplicates one page of tags with DISTINCT",
+    ),
+    (
+        re.compile(r'"core_answer"\."id" > '),
+        "an ?after_id= poll sorts only the answers after after_id",
+    ),
+]
+
+
+def api_patterns(patterns):
+    """Our named URL patterns, not those of the admin or third-party apps."""
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern
+        elif isinstance(pattern, URLResolver) and not pattern.app_name:
+            if isinstance(pattern.urlconf_name, (list, tuple)):
+                yield from api_patterns(pattern.url_patterns)
+
+
+def handles(pattern, method):
+    callback = pattern.callback
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        return method in actions
+    view_class = getattr(callback, "cls", None)
+    if view_class is not None:
+        return hasattr(view_class, method)
+    # plain Django views
+    return method == "get"
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every read route in the URLconf against seeded data, EXPLAIN "
+        "each SQL statement it runs, and flag sequential scans, sorts without "
+        "an index and slow plans. Seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--answers", type=int, default=4)
+        parser.add_argument(
+            "--slow-ms",
+            type=float,
+            default=20,
+            help="Flag statements whose plan takes longer than this (PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        self.slow_ms = options["slow_ms"]
+        flagged = 0
+        with transaction.atomic():
+            users = seed(
+                users=options["users"],
+                questions=options["questions"],
+                answers_per_question=options["answers"],
+            )
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+            user = users[0]
+            token = Token.objects.create(user=user)
+            client = APIClient(HTTP_AUTHORIZATION=f"Token {token.key}")
+            for method, path, data in self.routes(user):
+                flagged += self.audit(client, method, path, data)
+            transaction.set_rollback(True)
+
+        style = self.style.WARNING if flagged else self.style.SUCCESS
+        self.stdout.write(style(f"\n{flagged} statement(s) flagged"))
+
+    def routes(self, user):
+        """(method, path, data) for every read route, some with query variants."""
+        question = (
+            Question.objects.filter(author=user).first() or Question.objects.first()
+        )
+        answer = Answer.objects.filter(author=user).first() or Answer.objects.first()
+        objects = {Question: question, Answer: answer, User: user}
+        values = {
+            "question_id": question.pk,
+            "username": user.username,
+        }
+        question_ids = ",".join(
+            str(pk) for pk in Question.objects.values_list("pk", flat=True)[:20]
+        )
+        usernames = ",".join(User.objects.values_list("username", flat=True)[:20])
+        variants = {
+            "question-list": [
+                "",
+                "?page_size=20&page=2",
+                "?search=django",
+                f"?ids={question_ids}",
+            ],
+            "answer-list": ["", f"?after_id={answer.pk}"],
+            "profile-list": [f"?usernames={usernames}"],
+        }
+
+        gets, reads_by_post, seen = [], [], set()
+        for pattern in api_patterns(get_resolver().url_patterns):
+            if pattern.name in seen:
+                # format suffix variants of a route already listed
+                continue
+            seen.add(pattern.name)
+            view_class = getattr(pattern.callback, "cls", None)
+            if getattr(view_class, "read_only", False) and handles(pattern, "post"):
+                reads_by_post.append(pattern.name)
+                continue
+            if not handles(pattern, "get"):
+                continue
+            kwargs = {}
+            for name in pattern.pattern.regex.groupindex:
+                if name == "format":
+                    continue
+                if name in ("pk", "id"):
+                    obj = objects.get(getattr(view_class, "queryset", None).model)
+                    value = obj.pk if obj is not None else None
+                else:
+                    value = values.get(name)
+                if value is None:
+                    break
+                kwargs[name] = value
+            else:
+                path = reverse(pattern.name, kwargs=kwargs)
+                for query in variants.get(pattern.name, [""]):
+                    gets.append(("get", path + query, None))
+
+        routes = list(gets)
+        for name in reads_by_post:
+            # a batch of the routes above
+            batch = {"requests": [{"path": path} for _, path, _ in gets[:10]]}
+            routes.append(("post", reverse(name), batch))
+        return routes
+
+    def audit(self, client, method, path, data):
+        label = f"{method.upper()} {path}"
+        try:
+            # rolled back, so auditing a route can't change the data for the next
+            with transaction.atomic(), CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = getattr(client, method)(path, data, format="json")
+                elapsed = (time.perf_counter() - start) * 1000
+                transaction.set_rollback(True)
+        except Exception as exc:
+            self.stdout.write(self.style.ERROR(f"\n{label} failed: {exc}"))
+            return 1
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"\n{label} -> {response.status_code}, "
+                f"{len(context.captured_queries)} queries, {elapsed:.0f} ms"
+            )
+        )
+        if response.status_code >= 500:
+            self.stdout.write(self.style.ERROR("  - the route failed"))
+            return 1
+        if response.status_code >= 400:
+            # e.g. /schema/ before build_schema has been run
+            self.stdout.write(f"  - answered {response.status_code}")
+
+        # statements differing only in literals are explained once
+        shapes = Counter()
+        examples = {}
+        for query in context.captured_queries:
+            sql = query["sql"]
+            if sql.lstrip().upper().startswith("SELECT"):
+                shape = re.sub(r"\b\d+\b", "?", sql)
+                shapes[shape] += 1
+                examples.setdefault(shape, sql)
+
+        flagged = 0
+        for shape, count in shapes.items():
+            sql = examples[shape]
+            problems = self.explain(sql)
+            # a batch repeats statements across its sub-requests, not per row
+            if count > 1 and data is None:
+                problems.append(("repeated", f"ran {count} times (per-row query)"))
+            notes = []
+            for kind, problem in list(problems):
+                reason = next(
+                    (
+                        reason
+                        for pattern, reason in EXPECTED_SORTS
+                        if kind == "sort" and pattern.search(sql)
+                    ),
+                    None,
+                )
+                if reason:
+                    problems.remove((kind, problem))
+                    notes.append(f"{problem}; expected: {reason}")
+            if problems or notes:
+                self.stdout.write(f"  {sql[:200]}")
+            for note in notes:
+                self.stdout.write(f"    - {note}")
+            for _, problem in problems:
+                self.stdout.write(self.style.WARNING(f"    - {problem}"))
+            flagged += bool(problems)
+        return flagged
+
+    def explain(self, sql):
+        """(kind, description) of each problem in the plan of ``sql``."""
+        filtered = " WHERE " in sql.upper()
+        problems = []
+        # EXPLAIN ANALYZE runs the statement; roll back whatever it does
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                problems = self.postgres_problems(plan[0])
+            elif connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                problems = self.sqlite_problems(
+                    [row[-1] for row in cursor.fetchall()], filtered
+                )
+            transaction.set_rollback(True)
+        return problems
+
+    def postgres_problems(self, explained):
+        problems = []
+        total = explained.get("Execution Time", 0)
+        if total > self.slow_ms:
+            problems.append(("slow", f"slow plan: {total:.1f} ms"))
+
+        def walk(node):
+            kind = node["Node Type"]
+            if kind == "Seq Scan" and "Filter" in node:
+                problems.append(
+                    (
+                        "scan",
+                        f"sequential scan on {node['Relation Name']} "
+                        f"filtering {node['Filter']} "
+                        f"({node.get('Rows Removed by Filter', 0)} rows removed)",
+                    )
+                )
+            elif kind in ("Sort", "Incremental Sort"):
+                problems.append(
+                    (
+                        "sort",
+                        f"sort without an index on {', '.join(node['Sort Key'])} "
+                        f"({node.get('Sort Method', 'unknown method')})",
+                    )
+                )
+            for child in node.get("Plans", []):
+                walk(child)
+
+        walk(explained["Plan"])
+        return problems
+
+    def sqlite_problems(self, details, filtered):
+        problems = []
+        for detail in details:
+            if detail.startswith("SCAN") and "INDEX" not in detail and filtered:
+                problems.append(("scan", f"full table scan: {detail}"))
+            elif "TEMP B-TREE" in detail:
+                problems.append(("sort", f"sort without an index: {detail}"))
+        return problems
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Boots the app the way a fresh worker does, timing each phase.
+BOOT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+timings = {}
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+timings["settings"] = time.perf_counter()
+django.setup()
+timings["django.setup"] = time.perf_counter()
+from project.wsgi import application
+timings["wsgi application"] = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings["url conf"] = time.perf_counter()
+if len(sys.argv) > 1:
+    from django.test import Client
+    Client().get(sys.argv[1], HTTP_ACCEPT="application/json")
+    timings["first request"] = time.perf_counter()
+print(json.dumps({k: (v - start) * 1000 for k, v in timings.items()}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the app in a fresh interpreter and report time per startup phase "
+        "and import cost per module (from python -X importtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--first-request",
+            metavar="PATH",
+            nargs="?",
+            const="/questions",
+            help="Also time a first request to PATH (default /questions).",
+        )
+
+    def handle(self, *args, **options):
+        argv = [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT]
+        if options["first_request"]:
+            argv.append(options["first_request"])
+        result = subprocess.run(
+            argv,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            self.stderr.write(result.stderr)
+            return
+
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            self_us, cumulative_us, module = line[len("import time:") :].split("|")
+            # nested imports are indented below the single separating space
+            imports.append((int(cumulative_us), int(self_us), module[1:].rstrip()))
+
+        self.stdout.write("Startup phases (ms since the boot script started):")
+        for phase, elapsed in json.loads(result.stdout.splitlines()[-1]).items():
+            self.stdout.write(f"  {phase:<20} {elapsed:>9.1f}")
+
+        top_level = [entry for entry in imports if not entry[2].startswith(" ")]
+        self.stdout.write(
+            f"\nTotal import time: {sum(c for c, _, _ in top_level) / 1000:.1f} ms"
+        )
+        self.stdout.write(f"\nTop {options['top']} imports by cumulative cost:")
+        self.stdout.write(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+        for cumulative, own, module in sorted(imports, reverse=True)[: options["top"]]:
+            self.stdout.write(
+                f"  {cumulative / 1000:>13.1f} {own / 1000:>8.1f}  {module}"
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.accounts import purge_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the content of deactivated accounts in batches, then the "
+        "accounts themselves. Safe to interrupt and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Rows per transaction (default: ACCOUNT_PURGE_BATCH_SIZE).",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_pending(options["batch_size"], progress=self.report)
+        for deletion in purged:
+            self.stdout.write(self.style.SUCCESS(f"{self.summary(deletion)}, done"))
+        if not purged:
+            self.stdout.write("No accounts waiting to be purged")
+
+    def summary(self, deletion):
+        return (
+            f"{deletion.username}: {deletion.questions_deleted} questions, "
+            f"{deletion.answers_deleted} answers, "
+            f"{deletion.bookmarks_deleted} bookmarks deleted"
+        )
+
+    def report(self, deletion):
+        self.stdout.write(self.summary(deletion))
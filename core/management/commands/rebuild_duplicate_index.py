@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.duplicates import get_index
+from core.models import Question
+
+
+class Command(BaseCommand):
+    help = "Rebuild the near-duplicate question index from the database."
+
+    def handle(self, *args, **options):
+        rows = Question.objects.values_list("id", "title", "body").iterator(
+            chunk_size=2000
+        )
+        index = get_index()
+        index.rebuild(rows)
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {len(index)} questions into {index.path}")
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search index from the database. Needed after "
+        "bulk changes that bypass model signals."
+    )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        count = backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {count} questions with {type(backend).__name__}"
+            )
+        )
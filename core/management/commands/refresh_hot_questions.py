@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import refresh_hot_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the hot questions ranking. A job does this every "
+        "HOT_QUESTIONS_REFRESH_INTERVAL while views are coming in."
+    )
+
+    def handle(self, *args, **options):
+        count = refresh_hot_scores()
+        self.stdout.write(self.style.SUCCESS(f"Scored {count} recent questions"))
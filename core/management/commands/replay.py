@@ -0,0 +1,181 @@
+import asyncio
+import glob
+import http.client
+import json
+import math
+import statistics
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay requests recorded by TrafficRecorderMiddleware against a "
+        "running server, keeping their original spacing (scaled by --speed), "
+        "and report throughput, latency percentiles and errors per route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files", nargs="+", help="Recorded JSONL files; globs are expanded."
+        )
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Replay this many times faster than recorded; 0 sends as fast "
+            "as the connections allow.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Connections to the server, and so most requests in flight.",
+        )
+        parser.add_argument(
+            "--token",
+            help="API token sent with requests that were authenticated when "
+            "recorded.",
+        )
+        parser.add_argument(
+            "--read-only",
+            action="store_true",
+            help="Skip requests that would write.",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        records = self.load(options)
+        if not records:
+            raise CommandError("No requests to replay.")
+        self.stdout.write(
+            f"Replaying {len(records)} requests against {options['base_url']}"
+        )
+        start = time.perf_counter()
+        results, lag = asyncio.run(self.replay(records, options))
+        elapsed = time.perf_counter() - start
+        self.report(records, results, elapsed, lag)
+
+    def load(self, options):
+        paths = sorted(
+            path for pattern in options["files"] for path in glob.glob(pattern)
+        )
+        if not paths:
+            raise CommandError("No files match " + " ".join(options["files"]))
+        records = []
+        for path in paths:
+            with open(path, encoding="utf-8") as lines:
+                records.extend(json.loads(line) for line in lines if line.strip())
+        if options["read_only"]:
+            records = [record for record in records if record["method"] in SAFE_METHODS]
+        return sorted(records, key=lambda record: record["ts"])
+
+    async def replay(self, records, options):
+        url = urlsplit(options["base_url"])
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        # each connection is used by one request at a time, so the pool
+        # bounds how many are in flight
+        pool = asyncio.Queue()
+        for _ in range(options["concurrency"]):
+            pool.put_nowait(connection_class(url.netloc, timeout=options["timeout"]))
+
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(options["concurrency"]))
+        start, first = loop.time(), records[0]["ts"]
+        tasks, lag = [], 0.0
+        for record in records:
+            due = None
+            if options["speed"]:
+                due = start + (record["ts"] - first) / options["speed"]
+                if due > loop.time():
+                    await asyncio.sleep(due - loop.time())
+            connection = await pool.get()
+            if due is not None:
+                # how far behind the recorded schedule the server has pushed us
+                lag = max(lag, loop.time() - due)
+            tasks.append(
+                asyncio.create_task(self.send(pool, connection, record, url, options))
+            )
+        results = await asyncio.gather(*tasks)
+        while not pool.empty():
+            pool.get_nowait().close()
+        return results, lag
+
+    async def send(self, pool, connection, record, url, options):
+        try:
+            return await asyncio.to_thread(
+                self.request, connection, record, url, options
+            )
+        finally:
+            pool.put_nowait(connection)
+
+    def request(self, connection, record, url, options):
+        path = url.path.rstrip("/") + record["path"]
+        if record["query"]:
+            path += "?" + urlencode(record["query"])
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip"}
+        body = None
+        if record["body"] is not None:
+            body = json.dumps(record["body"])
+            headers["Content-Type"] = "application/json"
+        if record["authenticated"] and options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        start = time.perf_counter()
+        try:
+            connection.request(record["method"], path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # the next request on this connection reconnects
+            connection.close()
+            status = None
+        return status, (time.perf_counter() - start) * 1000
+
+    def report(self, records, results, elapsed, lag):
+        routes = defaultdict(list)
+        for record, result in zip(records, results):
+            route = f"{record['method']} {record['route'] or '(unresolved)'}"
+            routes[route].append((record, result))
+
+        self.stdout.write(
+            f"\n{'route':<36} {'requests':>8} {'req/s':>7} {'p50 ms':>7} "
+            f"{'p95 ms':>7} {'p99 ms':>7} {'errors':>7} {'recorded p50':>13}"
+        )
+        rows = sorted(routes.items(), key=lambda item: -len(item[1]))
+        for route, replayed in rows + [("all", list(zip(records, results)))]:
+            latencies = sorted(latency for _, (_, latency) in replayed)
+            errors = sum(
+                1 for _, (status, _) in replayed if status is None or status >= 500
+            )
+            recorded = statistics.median(
+                record["duration_ms"] for record, _ in replayed
+            )
+            self.stdout.write(
+                f"{route:<36} {len(replayed):>8} {len(replayed) / elapsed:>7.1f} "
+                f"{percentile(latencies, 0.5):>7.1f} {percentile(latencies, 0.95):>7.1f} "
+                f"{percentile(latencies, 0.99):>7.1f} "
+                f"{errors / len(replayed):>7.1%} {recorded:>13.1f}"
+            )
+        self.stdout.write(
+            f"\n{len(records)} requests in {elapsed:.1f} s; at worst "
+            f"{lag:.2f} s behind the recorded schedule. Errors are 5xx "
+            f"responses and failed connections."
+        )
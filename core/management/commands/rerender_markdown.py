@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.markdown import RENDERER_VERSION, render
+from core.models import Answer, Question
+
+
+def render_all(sources):
+    return [render(source) for source in sources]
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render question bodies and answer texts whose stored HTML predates "
+        "the current Markdown renderer, in a pool of processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Rendering processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every row, not only out-of-date ones.",
+        )
+
+    def handle(self, *args, **options):
+        with ProcessPoolExecutor(options["processes"]) as pool:
+            for model in (Question, Answer):
+                start = time.perf_counter()
+                rendered = self.rerender(model, pool, options)
+                self.stdout.write(
+                    f"Rendered {rendered} {model._meta.verbose_name_plural} in "
+                    f"{time.perf_counter() - start:.1f} s"
+                )
+
+    def batches(self, model, options):
+        """(ids, sources) of the rows to render, in primary key order."""
+        field = model.markdown_field
+        queryset = model.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.exclude(**{f"{field}_html_version": RENDERER_VERSION})
+        last = 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last).values_list("pk", field)[
+                    : options["batch_size"]
+                ]
+            )
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield rows
+
+    def rerender(self, model, pool, options):
+        # keep every process busy, without reading the whole table ahead
+        pending, rendered = [], 0
+        for rows in self.batches(model, options):
+            pending.append(
+                (rows, pool.submit(render_all, [source for _, source in rows]))
+            )
+            if len(pending) > options["processes"] * 2:
+                rendered += self.save(model, *pending.pop(0))
+        for rows, future in pending:
+            rendered += self.save(model, rows, future)
+        return rendered
+
+    def save(self, model, rows, future):
+        field = model.markdown_field
+        sources = dict(rows)
+        with transaction.atomic():
+            # rows edited since they were read were rendered by save() already
+            current = model.objects.select_for_update().filter(pk__in=sources)
+            unchanged = {
+                pk
+                for pk, source in current.values_list("pk", field)
+                if sources[pk] == source
+            }
+            objs = [
+                model(
+                    pk=pk,
+                    **{
+                        f"{field}_html": html,
+                        f"{field}_html_version": RENDERER_VERSION,
+                    },
+                )
+                for (pk, _), html in zip(rows, future.result())
+                if pk in unchanged
+            ]
+            model.objects.bulk_update(objs, [f"{field}_html", f"{field}_html_version"])
+        self.stdout.write(f"  up to {model._meta.model_name} {rows[-1][0]}")
+        return len(objs)
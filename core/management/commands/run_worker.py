@@ -0,0 +1,100 @@
+import os
+import signal
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import claim, requeue_stale, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs until stopped. SIGTERM or SIGINT stops "
+        "claiming new jobs and waits for running ones to finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOBS_CONCURRENCY,
+            help="Jobs to run at once (default: JOBS_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default=settings.JOBS_POOL,
+            help="Run jobs in threads, or in processes for CPU-bound jobs.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queue has no due jobs, instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        concurrency = options["concurrency"]
+        if options["pool"] == "process":
+            # children open their own connections; don't share the parent's
+            connections.close_all()
+            pool = ProcessPoolExecutor(concurrency)
+        else:
+            pool = ThreadPoolExecutor(concurrency)
+
+        self.next_requeue = 0
+        self.requeue()
+        self.stdout.write(
+            f"Running up to {concurrency} jobs at once in a {options['pool']} "
+            f"pool, pid {os.getpid()}"
+        )
+
+        running = set()
+        with pool:
+            while not self.stopping:
+                self.requeue()
+                free = concurrency - len(running)
+                ids = claim(free) if free else []
+                running |= {pool.submit(run, pk) for pk in ids}
+                if not running:
+                    if options["burst"]:
+                        break
+                    time.sleep(settings.JOBS_POLL_INTERVAL)
+                    continue
+                timeout = None if free == len(ids) else settings.JOBS_POLL_INTERVAL
+                done, running = wait(running, timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        # the job's outcome couldn't be recorded; it's requeued
+                        # once JOBS_STALE_AFTER passes
+                        self.stderr.write(f"Worker error: {future.exception()!r}")
+            wait(running)
+
+    def requeue(self):
+        """
+        Put back jobs abandoned by dead workers, at most once per
+        JOBS_REQUEUE_INTERVAL. This keeps running after startup: a worker that
+        crashed a moment ago left jobs that aren't stale yet.
+        """
+        now = time.monotonic()
+        if now < self.next_requeue:
+            return
+        self.next_requeue = now + settings.JOBS_REQUEUE_INTERVAL
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} abandoned job(s)")
+
+    def stop(self, signum, frame):
+        self.stdout.write("Stopping after running jobs finish")
+        self.stopping = True
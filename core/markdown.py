@@ -0,0 +1,328 @@
+"""
+Markdown rendering for question bodies and answer texts.
+
+Bodies and texts are rendered when they are saved (see core.signals) and the
+HTML is stored next to the source, so ``?body_format=html`` costs nothing per
+request. The renderer escapes the whole source before it adds markup, so the
+only tags in its output are the ones it writes, and links may only point to
+http(s) and mailto URLs. It covers what people write in questions: paragraphs
+and line breaks, headings, emphasis, strikethrough, inline code, fenced code
+blocks, block quotes, nested lists, links, autolinks and rules.
+
+Bump RENDERER_VERSION whenever the output changes. Rows rendered by an older
+version are re-rendered on read until ``manage.py rerender_markdown`` has
+caught them up.
+"""
+
+import re
+from html import escape, unescape
+
+RENDERER_VERSION = 2
+BODY_FORMAT_PARAM = "body_format"
+# block quotes and lists nested deeper than this are rendered as paragraphs
+MAX_NESTING = 16
+
+# Every pattern and scan below runs in time linear in the length of the
+# source: sources are user input, rendered inside the request that saves them.
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([\w+-]*)")
+_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})(?:\s+(.*))?$")
+_RULE_RE = re.compile(r"^ {0,3}([-*_])(?:\s*\1){2,}\s*$")
+_QUOTE_RE = re.compile(r"^ {0,3}&gt; ?")
+_ITEM_RE = re.compile(r"^( {0,3})(?:([-*+])|(\d{1,9})[.)])(\s+|$)")
+
+_BACKTICKS_RE = re.compile(r"`+")
+_ESCAPED_RE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!~|])")
+_AUTOLINK_RE = re.compile(r"&lt;((?:https?://|mailto:)[^\s<>]{1,500}?)&gt;")
+_LINK_RE = re.compile(
+    r"\[([^\[\]]+)\]\(\s*([^\s()\[\]]+)(?:\s+&quot;(.{0,200}?)&quot;)?\s*\)"
+)
+_DELIMITER_RE = re.compile(r"\*+|_+|~~")
+_TAGS = {"**": "strong", "__": "strong", "*": "em", "_": "em", "~~": "del"}
+_BREAK_RE = re.compile(r"(?<! ) {2,}\n|\\\n")
+_SAFE_URL_RE = re.compile(r"^(?:https?://|mailto:)", re.I)
+_PLACEHOLDER_RE = re.compile("\x00(\\d+)\x00")
+
+
+def render(source):
+    """Sanitized HTML for Markdown ``source``."""
+    if not source:
+        return ""
+    # escaped up front; NUL is reserved for the inline placeholders
+    text = escape(source.replace("\x00", ""), quote=True)
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").expandtabs(4).split("\n")
+    return "\n".join(_blocks(lines))
+
+
+def stored_html(source, html, version):
+    """The stored rendering of ``source``, or a fresh one if it's out of date."""
+    if version == RENDERER_VERSION:
+        return html
+    return render(source)
+
+
+def wants_html(request):
+    return (
+        request is not None
+        and getattr(request, "query_params", {}).get(BODY_FORMAT_PARAM) == "html"
+    )
+
+
+def _blocks(lines, depth=0):
+    html = []
+    nested = depth < MAX_NESTING
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+
+        fence = _FENCE_RE.match(line)
+        if fence:
+            marker, language = fence.groups()
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(marker):
+                body.append(lines[i])
+                i += 1
+            i += 1
+            attrs = f' class="language-{language}"' if language else ""
+            code = "".join(f"{line}\n" for line in body)
+            html.append(f"<pre><code{attrs}>{code}</code></pre>")
+            continue
+
+        heading = _HEADING_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            html.append(f"<h{level}>{_inline(_heading_text(heading))}</h{level}>")
+            i += 1
+            continue
+
+        if _RULE_RE.match(line):
+            html.append("<hr>")
+            i += 1
+            continue
+
+        if nested and _QUOTE_RE.match(line):
+            quoted = []
+            while i < len(lines) and lines[i].strip():
+                quoted.append(_QUOTE_RE.sub("", lines[i], count=1))
+                i += 1
+            blocks = _blocks(quoted, depth + 1)
+            html.append("<blockquote>\n" + "\n".join(blocks) + "\n</blockquote>")
+            continue
+
+        if nested and _ITEM_RE.match(line):
+            i = _list(lines, i, html, depth)
+            continue
+
+        # trailing spaces are kept, since two of them make a line break
+        paragraph = [line.lstrip()]
+        i += 1
+        while i < len(lines) and lines[i].strip() and not _starts_block(lines[i]):
+            paragraph.append(lines[i].lstrip())
+            i += 1
+        text = "\n".join(paragraph).rstrip()
+        html.append(f"<p>{_inline(text)}</p>")
+    return html
+
+
+def _heading_text(heading):
+    text = (heading.group(2) or "").strip()
+    # an optional closing sequence of #s, after a space
+    unclosed = text.rstrip("#")
+    if unclosed != text and (not unclosed or unclosed.endswith(" ")):
+        text = unclosed.rstrip()
+    return text
+
+
+def _next_filled(lines, i):
+    """The index of the first non-blank line from ``i`` on."""
+    while i < len(lines) and not lines[i].strip():
+        i += 1
+    return i
+
+
+def _starts_block(line):
+    return bool(
+        _FENCE_RE.match(line)
+        or _HEADING_RE.match(line)
+        or _RULE_RE.match(line)
+        or _QUOTE_RE.match(line)
+        or _ITEM_RE.match(line)
+    )
+
+
+def _list(lines, i, html, depth):
+    """Render the list starting at ``lines[i]``; returns the index after it."""
+    first = _ITEM_RE.match(lines[i])
+    ordered = first.group(3) is not None
+    items = []
+    loose = False
+    while i < len(lines):
+        item = _ITEM_RE.match(lines[i])
+        if not item or (item.group(3) is not None) != ordered:
+            break
+        # continuation lines are indented past the marker
+        indent = max(len(item.group(0)), len(item.group(1)) + 2)
+        content = [lines[i][len(item.group(0)) :]]
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                following = _next_filled(lines, i)
+                if following < len(lines) and lines[following].startswith(" " * indent):
+                    content.extend([""] * (following - i))
+                    loose = True
+                    i = following
+                    continue
+                break
+            if line.startswith(" " * indent):
+                content.append(line[indent:])
+            elif _starts_block(line):
+                break
+            else:
+                content.append(line.strip())
+            i += 1
+        items.append(content)
+        # a blank line between items makes the list loose
+        if i < len(lines) and not lines[i].strip():
+            following = _next_filled(lines, i)
+            if following < len(lines) and _ITEM_RE.match(lines[following]):
+                loose = True
+                i = following
+
+    tag = "ol" if ordered else "ul"
+    start = int(first.group(3)) if ordered else 1
+    attrs = f' start="{start}"' if start != 1 else ""
+    html.append(f"<{tag}{attrs}>")
+    for content in items:
+        blocks = _blocks(content, depth + 1)
+        if not loose and blocks and blocks[0].startswith("<p>"):
+            # tight lists don't wrap their text in paragraphs
+            blocks[0] = blocks[0][3:-4]
+        html.append("<li>" + "\n".join(blocks) + "</li>")
+    html.append(f"</{tag}>")
+    return i
+
+
+def _inline(text):
+    stash = []
+
+    def keep(fragment):
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    # code spans and backslash escapes are taken out first, so nothing inside
+    # them is formatted
+    text = _code_spans(text, keep)
+    text = _ESCAPED_RE.sub(lambda m: keep(m.group(1)), text)
+    text = _AUTOLINK_RE.sub(lambda m: keep(_link(m.group(1), m.group(1))), text)
+    text = _LINK_RE.sub(
+        lambda m: (
+            keep(_link(m.group(2), _emphasis(m.group(1)), m.group(3)))
+            if _safe_url(m.group(2))
+            else m.group(0)
+        ),
+        text,
+    )
+    text = _emphasis(text)
+    text = _BREAK_RE.sub("<br>\n", text)
+    while _PLACEHOLDER_RE.search(text):
+        text = _PLACEHOLDER_RE.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def _code_spans(text, keep):
+    """Replace each run of backticks and the next run of equal length with <code>."""
+    runs = list(_BACKTICKS_RE.finditer(text))
+    closers, last = [None] * len(runs), {}
+    for index in range(len(runs) - 1, -1, -1):
+        length = len(runs[index].group())
+        closers[index] = last.get(length)
+        last[length] = index
+
+    parts, position, index = [], 0, 0
+    while index < len(runs):
+        closer = closers[index]
+        if closer is None:
+            index += 1
+            continue
+        start, end = runs[index], runs[closer]
+        code = text[start.end() : end.start()].strip()
+        parts += [text[position : start.start()], keep(f"<code>{code}</code>")]
+        position = end.end()
+        index = closer + 1
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def _emphasis(text):
+    """
+    Turn *em*, _em_, **strong**, __strong__ and ~~del~~ into tags in one pass.
+    A closing delimiter pairs with the nearest open one of its kind; openers
+    left open inside that pair stay literal, so the tags always nest.
+    """
+    parts = []
+    # [index in openers, index in parts, still open], innermost last
+    openers = []
+    open_by_kind = {kind: [] for kind in _TAGS}
+    position = 0
+    for match in _DELIMITER_RE.finditer(text):
+        start, end = match.span()
+        parts.append(text[position:start])
+        position = end
+        before = text[start - 1] if start else " "
+        after = text[end] if end < len(text) else " "
+        run = match.group()
+        # a run like *** is ** then *
+        kinds = [run[:2]] * (len(run) // 2) + [run[:1]] * (len(run) % 2)
+        if run == "~~":
+            kinds = ["~~"]
+        can_open = not after.isspace()
+        can_close = not before.isspace()
+        for stack in open_by_kind.values():
+            while stack and not stack[-1][2]:
+                stack.pop()
+        if can_close:
+            # close the innermost open kind first
+            kinds.sort(key=lambda kind: -_innermost(open_by_kind[kind]))
+        for kind in kinds:
+            single = len(kind) == 1
+            stack = open_by_kind[kind]
+            while stack and not stack[-1][2]:
+                stack.pop()
+            if can_close and stack and not (single and _is_word(after)):
+                opener = stack.pop()
+                for inner in openers[opener[0] :]:
+                    inner[2] = False
+                del openers[opener[0] :]
+                parts[opener[1]] = f"<{_TAGS[kind]}>"
+                parts.append(f"</{_TAGS[kind]}>")
+            elif can_open and not (single and _is_word(before)):
+                opener = [len(openers), len(parts), True]
+                openers.append(opener)
+                stack.append(opener)
+                parts.append(kind)
+            else:
+                parts.append(kind)
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def _innermost(stack):
+    return stack[-1][0] if stack else -1
+
+
+def _is_word(char):
+    return char.isalnum() or char == "_"
+
+
+def _safe_url(url):
+    return bool(_SAFE_URL_RE.match(unescape(url)))
+
+
+def _link(url, label, title=None):
+    # url and title are still escaped from render()
+    title = f' title="{title}"' if title else ""
+    return f'<a href="{url}"{title} rel="nofollow noopener">{label}</a>'
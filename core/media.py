@@ -0,0 +1,107 @@
+"""
+Media helpers: memoized file URLs for user photos, and a media view that lets
+the front-end server send files instead of streaming them through Django.
+"""
+
+import mimetypes
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+from django.views.static import serve
+
+
+class MediaURLCache:
+    """
+    Bounded LRU of storage URLs. Entries expire after ``ttl`` seconds, so
+    signed URLs are never handed out close to their own expiry.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, field_file):
+        return self.url(field_file.instance.pk, field_file.name, field_file.storage)
+
+    def url(self, pk, name, storage):
+        """The URL of file ``name`` belonging to the object with ``pk``."""
+        # a new upload gets a new file name, which acts as the photo version
+        key = (pk, name)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        url = storage.url(name)
+        with self._lock:
+            self._entries[key] = (url, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return url
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+photo_urls = MediaURLCache(
+    maxsize=settings.MEDIA_URL_CACHE_SIZE, ttl=settings.MEDIA_URL_CACHE_TTL
+)
+
+
+def media_urlpatterns():
+    """
+    The local media route. Like django.conf.urls.static.static(), it's only
+    there with DEBUG on, unless the front-end server is set up to send the
+    files; with S3, media never goes through Django.
+    """
+    offloaded = settings.MEDIA_ACCEL_REDIRECT_PREFIX or settings.MEDIA_USE_SENDFILE
+    if settings.USE_S3 or not (settings.DEBUG or offloaded):
+        return []
+    return [
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.+)$",
+            serve_media,
+            name="media",
+        )
+    ]
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an uploaded file from local storage. Behind nginx or a sendfile
+    capable server, only headers are returned and the server sends the file.
+    """
+    path = posixpath.normpath(path).lstrip("/")
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX or settings.MEDIA_USE_SENDFILE:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        response = HttpResponse(content_type=content_type)
+        if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+            prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/")
+            response["X-Accel-Redirect"] = f"{prefix}/{path}"
+        else:
+            response["X-Sendfile"] = fullpath
+    else:
+        # FileResponse lets the WSGI server use os.sendfile via wsgi.file_wrapper
+        response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response["Cache-Control"] = f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+    return response
@@ -0,0 +1,248 @@
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from urllib.parse import parse_qsl
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signing import BadSignature, Signer
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from .db_routers import REPLICA, use_replica, reset_replica
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Send safe-method requests, and requests to views whose class sets
+    ``read_only``, to the read replica, unless the client wrote something
+    recently. After a successful write, the response carries a pin (as a
+    cookie and as a header, for clients that don't keep cookies) that keeps
+    the client's reads on the primary until replication has caught up.
+
+    The pin is the time it expires, signed, so clients can't forge one that
+    keeps them on the primary for good.
+    """
+
+    signer = Signer(salt="core.middleware.ReplicaRoutingMiddleware")
+
+    def __init__(self, get_response):
+        if REPLICA not in connections.settings:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def is_pinned(self, request):
+        pin = request.headers.get(settings.REPLICA_PIN_HEADER) or request.COOKIES.get(
+            settings.REPLICA_PIN_COOKIE
+        )
+        if not pin:
+            return False
+        try:
+            return float(self.signer.unsign(pin)) > time.time()
+        except (BadSignature, ValueError):
+            return False
+
+    def is_read(self, request, view_func):
+        # a view class can declare itself read-only, like the POST /batch view
+        view_class = getattr(view_func, "cls", None)
+        return request.method in SAFE_METHODS or getattr(view_class, "read_only", False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.replica_read = self.is_read(request, view_func)
+        request.replica_token = use_replica(
+            request.replica_read and not self.is_pinned(request)
+        )
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            if hasattr(request, "replica_token"):
+                reset_replica(request.replica_token)
+
+        read = getattr(request, "replica_read", request.method in SAFE_METHODS)
+        # a rejected request wrote nothing worth waiting for
+        if not read and response.status_code < 400:
+            max_age = settings.REPLICA_PIN_SECONDS
+            pin = self.signer.sign(str(int(time.time()) + max_age))
+            response[settings.REPLICA_PIN_HEADER] = pin
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, pin, max_age=max_age, httponly=True
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress responses larger than COMPRESSION_MIN_SIZE with brotli (when the
+    brotli package is installed and the client accepts it) or gzip.
+
+    HTML is left alone: the browsable API and admin pages embed CSRF tokens,
+    and compressing secrets next to reflected input invites BREACH. For the
+    same reason, so are the views in COMPRESSION_EXCLUDED_URL_NAMES, which
+    return auth tokens.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def choose_encoding(self, request):
+        accepted = {
+            coding.split(";")[0].strip()
+            for coding in request.headers.get("Accept-Encoding", "").split(",")
+        }
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def returns_secrets(self, request):
+        match = request.resolver_match
+        return (
+            match is not None
+            and match.url_name in settings.COMPRESSION_EXCLUDED_URL_NAMES
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or response.get("Content-Type", "").startswith("text/html")
+            or self.returns_secrets(request)
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = self.choose_encoding(request)
+        if encoding == "br":
+            compressed = brotli.compress(
+                response.content, quality=settings.BROTLI_QUALITY
+            )
+        elif encoding == "gzip":
+            compressed = gzip.compress(
+                response.content, compresslevel=settings.GZIP_LEVEL, mtime=0
+            )
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = encoding
+        # a strong ETag would no longer match the bytes on the wire
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
+
+
+SENSITIVE_KEYS = ("password", "token", "secret", "key", "uid", "email")
+REDACTED = "[redacted]"
+
+
+def sanitize(value):
+    """``value`` with anything under a credential-like key redacted."""
+    if isinstance(value, dict):
+        return {
+            key: (
+                REDACTED
+                if any(word in str(key).lower() for word in SENSITIVE_KEYS)
+                else sanitize(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [sanitize(item) for item in value]
+    return value
+
+
+class TrafficRecorderMiddleware:
+    """
+    Append a sample of TRAFFIC_RECORD_RATE of requests as JSON lines to
+    TRAFFIC_RECORD_PATH, for ``manage.py replay``. Each worker process writes
+    its own file (the path with its pid added), rotated at
+    TRAFFIC_RECORD_MAX_BYTES. Only the route, query and JSON body are kept,
+    never headers or cookies, and credential-like fields are redacted.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TRAFFIC_RECORD_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._handler = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def handler(self):
+        # opened on first use, so that forked workers don't share the file
+        # of a master process that loaded the app
+        with self._lock:
+            if self._pid != os.getpid():
+                root, ext = os.path.splitext(settings.TRAFFIC_RECORD_PATH)
+                path = f"{root}-{os.getpid()}{ext}"
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._handler = RotatingFileHandler(
+                    path,
+                    maxBytes=settings.TRAFFIC_RECORD_MAX_BYTES,
+                    backupCount=settings.TRAFFIC_RECORD_BACKUP_COUNT,
+                    encoding="utf-8",
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+                self._pid = os.getpid()
+        return self._handler
+
+    def read_body(self, request):
+        if request.content_type != "application/json":
+            return None
+        try:
+            if int(request.META.get("CONTENT_LENGTH") or 0) > 64 * 1024:
+                return None
+            return sanitize(json.loads(request.body))
+        except ValueError:
+            return None
+
+    def __call__(self, request):
+        if random.random() >= settings.TRAFFIC_RECORD_RATE:
+            return self.get_response(request)
+
+        # read before the view consumes the stream
+        body = self.read_body(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        user = getattr(request, "user", None)
+        record = {
+            "ts": round(time.time(), 3),
+            "method": request.method,
+            "route": match.view_name if match else None,
+            "path": request.path_info,
+            "query": sanitize(dict(parse_qsl(request.META.get("QUERY_STRING", "")))),
+            "body": body,
+            "authenticated": bool(user and user.is_authenticated),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+        }
+        self.handler.handle(
+            logging.makeLogRecord({"msg": json.dumps(record, default=str)})
+        )
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_bookmark_unique_question_bookmark_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionStats",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="core.question",
+                    ),
+                ),
+                ("views", models.PositiveBigIntegerField(default=0)),
+                ("hot_score", models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0009_question_created_at_questionstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["question", "id"], name="core_answer_questio_16b190_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["author", "id"], name="core_answer_author__8ae3c3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["user", "id"], name="core_bookma_user_id_0001ad_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["author", "id"], name="core_questi_author__ab3934_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="questionstats",
+            index=models.Index(
+                fields=["hot_score", "question"], name="core_questi_hot_sco_275a62_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0012_job"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="question",
+            name="title",
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="question",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, db_index=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
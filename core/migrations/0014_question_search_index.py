@@ -0,0 +1,81 @@
+from django.db import migrations
+
+# Search documents live in tables only one database vendor understands; see
+# core.search, and the unmanaged models that map them in core.models. Like the
+# FTS5 table, the PostgreSQL table has no foreign key: documents are removed by
+# core.signals, and a question that no longer exists can't match anyway.
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE core_question_search (
+        question_id integer PRIMARY KEY,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX core_question_search_document ON core_question_search "
+    "USING gin (document)",
+    """
+    INSERT INTO core_question_search (question_id, document)
+    SELECT q.id,
+        setweight(to_tsvector('english', q.title), 'A') ||
+        setweight(to_tsvector('english', coalesce(tags.names, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(q.body, '')), 'C')
+    FROM core_question q
+    LEFT JOIN (
+        SELECT ti.object_id, string_agg(t.name, ' ') AS names
+        FROM taggit_taggeditem ti
+        JOIN taggit_tag t ON t.id = ti.tag_id
+        JOIN django_content_type ct ON ct.id = ti.content_type_id
+        WHERE ct.app_label = 'core' AND ct.model = 'question'
+        GROUP BY ti.object_id
+    ) tags ON tags.object_id = q.id
+    """,
+]
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE core_question_fts USING fts5("
+    "title, tags, body, tokenize = 'porter unicode61')",
+    """
+    INSERT INTO core_question_fts (rowid, title, tags, body)
+    SELECT q.id, q.title, coalesce(tags.names, ''), coalesce(q.body, '')
+    FROM core_question q
+    LEFT JOIN (
+        SELECT ti.object_id, group_concat(t.name, ' ') AS names
+        FROM taggit_taggeditem ti
+        JOIN taggit_tag t ON t.id = ti.tag_id
+        JOIN django_content_type ct ON ct.id = ti.content_type_id
+        WHERE ct.app_label = 'core' AND ct.model = 'question'
+        GROUP BY ti.object_id
+    ) tags ON tags.object_id = q.id
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        "postgresql": POSTGRES_CREATE,
+        "sqlite": SQLITE_CREATE,
+    }.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    table = {
+        "postgresql": "core_question_search",
+        "sqlite": "core_question_fts",
+    }.get(schema_editor.connection.vendor)
+    if table:
+        schema_editor.execute(f"DROP TABLE {table}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0013_created_at_for_admin"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("taggit", "0005_auto_20220424_2025"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
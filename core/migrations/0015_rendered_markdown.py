@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0014_question_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="text_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="text_html_version",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="body_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="body_html_version",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:58
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0015_rendered_markdown"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                models.F("question"),
+                models.OrderBy(
+                    django.db.models.functions.comparison.Coalesce(
+                        "accepted",
+                        django.db.models.expressions.RawSQL(
+                            "false", [], output_field=models.BooleanField()
+                        ),
+                    ),
+                    descending=True,
+                ),
+                models.F("id"),
+                name="core_answer_thread_idx",
+            ),
+        ),
+        # the thread index leads with question too
+        migrations.RemoveIndex(
+            model_name="answer",
+            name="core_answer_questio_16b190_idx",
+        ),
+    ]
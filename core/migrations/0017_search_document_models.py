@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:35
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0016_answer_thread_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionFTSDocument",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="fts_document",
+                        serialize=False,
+                        to="core.question",
+                    ),
+                ),
+                ("document", models.TextField(db_column="core_question_fts")),
+            ],
+            options={
+                "db_table": "core_question_fts",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="QuestionSearchDocument",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="core.question",
+                    ),
+                ),
+                ("document", django.contrib.postgres.search.SearchVectorField()),
+            ],
+            options={
+                "db_table": "core_question_search",
+                "managed": False,
+            },
+        ),
+    ]
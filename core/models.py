@@ -1,31 +1,147 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from taggit.managers import TaggableManager
 from phonenumber_field.modelfields import PhoneNumberField
 
+from . import markdown
+
 
 class User(AbstractUser):
     photo = models.ImageField(upload_to="user_profile_photos", null=True, blank=True)
     phone = PhoneNumberField(blank=True, null=True)
 
 
-class Question(models.Model):
-    title = models.CharField(max_length=255)
+class RenderedMarkdown:
+    """
+    Render the Markdown in ``markdown_field`` into ``<markdown_field>_html``
+    whenever the model is saved; see core.markdown.
+    """
+
+    markdown_field = None
+
+    def render_markdown(self):
+        source = getattr(self, self.markdown_field)
+        setattr(self, f"{self.markdown_field}_html", markdown.render(source))
+        setattr(self, f"{self.markdown_field}_html_version", markdown.RENDERER_VERSION)
+        return self
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or self.markdown_field in update_fields:
+            self.render_markdown()
+            if update_fields is not None:
+                update_fields = {
+                    *update_fields,
+                    f"{self.markdown_field}_html",
+                    f"{self.markdown_field}_html_version",
+                }
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Question(RenderedMarkdown, models.Model):
+    title = models.CharField(max_length=255, db_index=True)
     body = models.TextField(null=True, blank=True)
+    body_html = models.TextField(blank=True, default="", editable=False)
+    body_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="questions")
     tags = TaggableManager(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    markdown_field = "body"
+
+    class Meta:
+        indexes = [models.Index(fields=["author", "id"])]
 
     def __str__(self):
         return self.title
 
 
-class Answer(models.Model):
+# Rows of the search index tables in core.search, mapped so searches can
+# join them to questions. Migration 0014 creates the one for the database
+# vendor in use; core.signals writes to it.
+class QuestionSearchDocument(models.Model):
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_constraint=False,
+        related_name="search_document",
+    )
+    document = SearchVectorField()
+
+    class Meta:
+        managed = False
+        db_table = "core_question_search"
+
+
+class QuestionFTSDocument(models.Model):
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="fts_document",
+    )
+    # FTS5's hidden column named after the table, which MATCH and bm25() take
+    document = models.TextField(db_column="core_question_fts")
+
+    class Meta:
+        managed = False
+        db_table = "core_question_fts"
+
+
+class QuestionStats(models.Model):
+    """
+    Counters kept apart from Question, so view tracking never contends for
+    question rows. Written in batches by core.counters.
+    """
+
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    views = models.PositiveBigIntegerField(default=0)
+    hot_score = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["hot_score", "question"])]
+
+    def __str__(self):
+        return f"{self.question} stats"
+
+
+# Answer threads list the accepted answer first, then the rest oldest first.
+# False is written as SQL rather than passed as a parameter, so that ORDER BY
+# matches the index expression on SQLite too; SQLite can't index NULLS LAST.
+ACCEPTED_FIRST = Coalesce(
+    "accepted", RawSQL("false", [], output_field=models.BooleanField())
+).desc()
+
+
+class Answer(RenderedMarkdown, models.Model):
     text = models.TextField()
+    text_html = models.TextField(blank=True, default="", editable=False)
+    text_html_version = models.PositiveSmallIntegerField(default=0, editable=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="answers")
     question = models.ForeignKey(
         Question, on_delete=models.CASCADE, related_name="answers"
     )
     accepted = models.BooleanField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    markdown_field = "text"
+    THREAD_ORDER = [ACCEPTED_FIRST, "id"]
+
+    class Meta:
+        indexes = [
+            models.Index(
+                F("question"), ACCEPTED_FIRST, F("id"), name="core_answer_thread_idx"
+            ),
+            models.Index(fields=["author", "id"]),
+        ]
 
     def __str__(self):
         return self.text
@@ -47,6 +163,7 @@ class Bookmark(models.Model):
         null=True,
         blank=True,
     )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
         constraints = [
@@ -64,6 +181,60 @@ class Bookmark(models.Model):
                 fields=["user", "answer"], name="unique_answer_bookmark"
             ),
         ]
+        indexes = [models.Index(fields=["user", "id"])]
 
     def __str__(self):
         return f"{self.user} bookmarks"
+
+
+class AccountDeletion(models.Model):
+    """
+    A deleted account whose content is still being removed. The user is
+    deactivated when this is created; core.accounts.purge_account deletes
+    their content in batches and records progress here.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.SET_NULL, null=True, related_name="deletion"
+    )
+    username = models.CharField(max_length=150)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    questions_deleted = models.PositiveIntegerField(default=0)
+    answers_deleted = models.PositiveIntegerField(default=0)
+    bookmarks_deleted = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Deletion of {self.username}"
+
+
+class Job(models.Model):
+    """A unit of deferred work, run by `manage.py run_worker`; see core.jobs."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    run_after = models.DateTimeField()
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
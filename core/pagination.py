@@ -0,0 +1,125 @@
+"""
+Pagination that avoids exact ``COUNT(*)`` over large result sets.
+
+On PostgreSQL, the planner's row estimate is used as the count once it
+passes ESTIMATED_COUNT_THRESHOLD. Smaller results, and other databases,
+get an exact count. So do pages at or past the estimated end, since the
+estimate can be off in either direction.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+def estimate_count(queryset):
+    """Return the planner's row estimate for a queryset, or None if unavailable."""
+    if not isinstance(queryset, QuerySet):
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            # unfiltered: the table statistics are cheaper than planning
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 (or 0 before PostgreSQL 14) until first analyzed
+            return int(row[0]) if row and row[0] > 0 else None
+
+        sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator whose ``count`` may be an estimate; ``is_approximate`` says
+    which. Works for the Django admin and, through EstimatedCountPagination,
+    for API views.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_approximate = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            self.is_approximate = True
+            return estimate
+        return super().count
+
+    def use_exact_count(self, count=None):
+        self.is_approximate = False
+        self.__dict__["count"] = Paginator.count.func(self) if count is None else count
+        self.__dict__.pop("num_pages", None)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.is_approximate:
+                raise
+        # the estimate may fall short of the real count
+        self.use_exact_count()
+        return super().validate_number(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_approximate or self.orphans:
+            return super().page(number)
+
+        # one row past the page says whether any follow, whatever the estimate
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            if number >= self.num_pages:
+                # rows beyond the estimated last page
+                self.use_exact_count()
+            return self._get_page(rows[: self.per_page], number, self)
+        if not rows and number > 1:
+            # past the real end; this raises EmptyPage
+            self.use_exact_count()
+            return super().page(number)
+        self.use_exact_count(bottom + len(rows))
+        return self._get_page(rows, number, self)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Opt-in page-number pagination: responses stay unpaginated unless the
+    client passes ?page_size=. Paginated responses report whether ``count``
+    is an estimate.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_is_approximate"] = self.page.paginator.is_approximate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return response_schema
@@ -0,0 +1,59 @@
+"""
+Faster JSON rendering and parsing with orjson, plus an optional MessagePack
+renderer. Both libraries are optional: without orjson the classes fall back to
+DRF's stdlib-based behaviour, and MessagePack is only offered when msgpack is
+installed (see REST_FRAMEWORK in settings).
+"""
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        # DRF's encoder still covers lazy strings, Decimals, querysets, etc.
+        return orjson.dumps(data, default=self.encoder_class().default, option=option)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
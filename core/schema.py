@@ -0,0 +1,110 @@
+"""
+Serve the OpenAPI schema from artifacts built ahead of time by
+``manage.py build_schema``, instead of introspecting every view per request.
+"""
+
+import gzip
+import hashlib
+import json
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+FORMATS = {
+    "yaml": "application/vnd.oai.openapi",
+    "json": "application/vnd.oai.openapi+json",
+}
+
+
+def build_artifacts(directory):
+    """
+    Generate the schema in every format and write it, with a gzipped copy and
+    a manifest recording each file's version, to ``directory``.
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    renderers = {"yaml": OpenApiYamlRenderer(), "json": OpenApiJsonRenderer()}
+
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for fmt, renderer in renderers.items():
+        body = renderer.render(schema, renderer_context={})
+        (directory / f"schema.{fmt}").write_bytes(body)
+        (directory / f"schema.{fmt}.gz").write_bytes(
+            gzip.compress(body, compresslevel=9, mtime=0)
+        )
+        manifest[fmt] = hashlib.sha256(body).hexdigest()[:16]
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+_artifacts = {}
+
+
+def load_artifact(fmt):
+    """Return (body, gzipped body, version) for a format, or None if not built."""
+    # only found artifacts are cached, so a schema built later is picked up
+    if fmt not in _artifacts:
+        artifact = read_artifact(fmt)
+        if artifact is None:
+            return None
+        _artifacts[fmt] = artifact
+    return _artifacts[fmt]
+
+
+def read_artifact(fmt):
+    directory = settings.SCHEMA_ARTIFACT_DIR
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text())
+        return (
+            (directory / f"schema.{fmt}").read_bytes(),
+            (directory / f"schema.{fmt}.gz").read_bytes(),
+            manifest[fmt],
+        )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def etag_matches(etag, if_none_match):
+    """Whether an If-None-Match header matches ``etag``, by weak comparison."""
+    etags = parse_etags(if_none_match)
+    return "*" in etags or any(tag.removeprefix("W/") == etag for tag in etags)
+
+
+def requested_format(request):
+    fmt = request.GET.get("format")
+    if fmt in FORMATS:
+        return fmt
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+@require_safe
+def schema_view(request):
+    fmt = requested_format(request)
+    artifact = load_artifact(fmt)
+    if artifact is None:
+        if settings.DEBUG:
+            live_view = import_string("drf_spectacular.views.SpectacularAPIView")
+            return live_view.as_view()(request)
+        raise Http404("The schema has not been built; run manage.py build_schema.")
+
+    body, gzipped, version = artifact
+    etag = f'"{version}"'
+    if etag_matches(etag, request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    elif "gzip" in request.headers.get("Accept-Encoding", ""):
+        response = HttpResponse(gzipped, content_type=FORMATS[fmt])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(body, content_type=FORMATS[fmt])
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=3600"
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
@@ -0,0 +1,276 @@
+"""
+Full-text search over questions, behind ``?search=``.
+
+Each backend keeps a search document per question (title, tag names, body)
+in its own index table, and they share one contract:
+
+- a question matches when every search term, after English stemming, occurs
+  in its title, tags or body;
+- results are ordered by relevance, title matches weighing more than tag
+  matches, which weigh more than body matches; ties go to the older question;
+- the queryset comes back annotated with ``search_rank``, higher is better.
+
+PostgreSQL keeps a tsvector per question under a GIN index. SQLite keeps an
+FTS5 virtual table. Both tables are created by migration 0014, and signal
+receivers in core.signals keep documents in step with question and tag
+changes. Bulk writes that skip signals should call ``index()`` themselves, or
+run ``manage.py rebuild_search_index``. Other databases fall back to
+unindexed substring matching.
+"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import Question, QuestionFTSDocument, QuestionSearchDocument
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 10
+_TERM_RE = re.compile(r"\w+")
+
+
+def search_terms(text):
+    """The words of a search, lowercased, without any query syntax."""
+    return _TERM_RE.findall(text.lower())[:MAX_TERMS]
+
+
+class SearchBackend(ABC):
+    @abstractmethod
+    def search(self, queryset, text):
+        """``queryset`` narrowed to matches for ``text``, ranked."""
+
+    @abstractmethod
+    def index(self, ids):
+        """(Re)index the questions with these ids."""
+
+    @abstractmethod
+    def remove(self, ids):
+        """Drop the documents of the questions with these ids."""
+
+    @abstractmethod
+    def rebuild(self):
+        """Reindex every question; returns how many were indexed."""
+
+
+class IndexedSearchBackend(SearchBackend):
+    """A backend keeping its documents in ``model``, joined to questions."""
+
+    # the document model in core.models, and its reverse one-to-one on Question
+    model = None
+    relation = None
+    batch_size = 1000
+
+    @abstractmethod
+    def query(self, terms):
+        """The engine's query for ``terms``."""
+
+    @abstractmethod
+    def match(self, query):
+        """A filter on questions whose document matches ``query``."""
+
+    @abstractmethod
+    def rank(self, query):
+        """An expression scoring a question's document against ``query``."""
+
+    @abstractmethod
+    def write(self, cursor, documents):
+        """Insert (id, title, tags, body) documents."""
+
+    def search(self, queryset, text):
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+        query = self.query(terms)
+        # an inner join, so the engine finds matches through its index and
+        # scores each one once; a correlated subquery per question re-runs the
+        # whole FTS5 query for every row
+        return (
+            queryset.filter(self.match(query))
+            .annotate(search_rank=self.rank(query))
+            .order_by("-search_rank", "id")
+        )
+
+    def documents(self, ids):
+        tags = defaultdict(list)
+        tagged = Question.tags.through.objects.filter(
+            content_type=ContentType.objects.get_for_model(Question),
+            object_id__in=ids,
+        )
+        for object_id, name in tagged.values_list("object_id", "tag__name"):
+            tags[object_id].append(name)
+        return [
+            (pk, title, " ".join(tags[pk]), body or "")
+            for pk, title, body in Question.objects.filter(pk__in=ids).values_list(
+                "id", "title", "body"
+            )
+        ]
+
+    def index(self, ids):
+        ids = list(ids)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(ids), self.batch_size):
+                batch = ids[start : start + self.batch_size]
+                self.remove(batch)
+                self.write(cursor, self.documents(batch))
+
+    def remove(self, ids):
+        self.model.objects.filter(pk__in=list(ids)).delete()
+
+    def rebuild(self):
+        with transaction.atomic():
+            self.model.objects.all().delete()
+            ids = list(Question.objects.order_by("id").values_list("id", flat=True))
+            self.index(ids)
+        return len(ids)
+
+
+class PostgresSearchBackend(IndexedSearchBackend):
+    model = QuestionSearchDocument
+    relation = "search_document"
+    config = "english"
+
+    def query(self, terms):
+        return SearchQuery(" ".join(terms), config=self.config)
+
+    def match(self, query):
+        return Q(**{f"{self.relation}__document": query})
+
+    def rank(self, query):
+        return SearchRank(F(f"{self.relation}__document"), query)
+
+    def write(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {self.model._meta.db_table} (question_id, document) "
+            f"VALUES (%s, "
+            f"setweight(to_tsvector('{self.config}', %s), 'A') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'B') || "
+            f"setweight(to_tsvector('{self.config}', %s), 'C'))",
+            documents,
+        )
+
+
+@QuestionFTSDocument._meta.get_field("document").register_lookup
+class Match(Lookup):
+    """FTS5's ``<table> MATCH <query>``."""
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", (*lhs_params, *rhs_params)
+
+
+class BM25(Func):
+    """FTS5's bm25() score of the matched row, lower for better matches."""
+
+    function = "bm25"
+    output_field = FloatField()
+
+
+class SQLiteSearchBackend(IndexedSearchBackend):
+    model = QuestionFTSDocument
+    relation = "fts_document"
+    # bm25 column weights, in table column order: title, tags, body
+    weights = (10.0, 5.0, 1.0)
+
+    def query(self, terms):
+        # quoted, so terms are never read as FTS5 operators
+        return " ".join(f'"{term}"' for term in terms)
+
+    def match(self, query):
+        return Q(**{f"{self.relation}__document__match": query})
+
+    def rank(self, query):
+        return -BM25(F(f"{self.relation}__document"), *map(Value, self.weights))
+
+    def write(self, cursor, documents):
+        cursor.executemany(
+            f"INSERT INTO {self.model._meta.db_table} (rowid, title, tags, body) "
+            f"VALUES (%s, %s, %s, %s)",
+            documents,
+        )
+
+
+class SubstringSearchBackend(SearchBackend):
+    """
+    Case-insensitive substring matching, what DRF's SearchFilter does, for
+    databases without a backend above. Nothing is indexed and nothing is
+    ranked, so results are in id order.
+    """
+
+    def search(self, queryset, text):
+        terms = search_terms(text)
+        if not terms:
+            return queryset
+        return (
+            queryset.filter(
+                reduce(
+                    and_,
+                    (
+                        Q(title__icontains=term)
+                        | Q(body__icontains=term)
+                        | Q(tags__name__icontains=term)
+                        for term in terms
+                    ),
+                )
+            )
+            .distinct()
+            .annotate(search_rank=Value(0.0, output_field=FloatField()))
+            .order_by("id")
+        )
+
+    def index(self, ids):
+        pass
+
+    def remove(self, ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        if settings.SEARCH_BACKEND:
+            backend_class = import_string(settings.SEARCH_BACKEND)
+        elif connection.vendor in BACKENDS:
+            backend_class = BACKENDS[connection.vendor]
+        else:
+            logger.warning(
+                "No search backend for %s, using substring matching; "
+                "set SEARCH_BACKEND.",
+                connection.vendor,
+            )
+            backend_class = SubstringSearchBackend
+        _backend = backend_class()
+    return _backend
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """DRF's ?search= parameter, answered by the configured search backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "")
+        return get_search_backend().search(queryset, text)
@@ -0,0 +1,74 @@
+"""
+Synthetic data for audits, benchmarks and tests, created with bulk inserts.
+"""
+
+import random
+
+from django.contrib.auth.hashers import make_password
+from taggit.models import Tag
+
+from .models import User, Question, Answer, Bookmark
+from .search import get_search_backend
+
+WORDS = (
+    "django python query index cache list dict loop class async test deploy "
+    "serializer model view migration database postgres sqlite token request "
+    "response error bug import module package thread process memory speed"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def seed(users=20, questions=200, answers_per_question=3, tags=15, seed=0, authors=()):
+    """
+    Create users, questions, answers, tags and bookmarks. Content is written
+    by ``authors`` plus ``users`` new users, and each of them bookmarks a few
+    of the new questions and answers. Returns the authors and new users.
+    """
+    rng = random.Random(seed)
+    password = make_password(None)
+    offset = User.objects.count()
+    created_users = list(authors) + User.objects.bulk_create(
+        User(username=f"seed-user-{offset + i}", password=password)
+        for i in range(users)
+    )
+    created_tags = Tag.objects.bulk_create(
+        Tag(name=f"seed-tag-{offset}-{i}", slug=f"seed-tag-{offset}-{i}")
+        for i in range(tags)
+    )
+    created_questions = Question.objects.bulk_create(
+        Question(
+            title=sentence(rng, 8),
+            body=sentence(rng, 40),
+            author=rng.choice(created_users),
+        ).render_markdown()
+        for _ in range(questions)
+    )
+    through = Question.tags.through
+    through.objects.bulk_create(
+        through(tag=tag, content_object=question)
+        for question in created_questions
+        for tag in rng.sample(created_tags, min(2, tags))
+    )
+    # bulk inserts skip the signals that keep the search index up to date
+    get_search_backend().index(question.pk for question in created_questions)
+    created_answers = Answer.objects.bulk_create(
+        Answer(
+            text=sentence(rng, 30),
+            author=rng.choice(created_users),
+            question=question,
+            accepted=True if i == 0 and rng.random() < 0.3 else None,
+        ).render_markdown()
+        for question in created_questions
+        for i in range(answers_per_question)
+    )
+    bookmarks = []
+    for user in created_users:
+        for question in rng.sample(created_questions, min(3, questions)):
+            bookmarks.append(Bookmark(user=user, question=question))
+        for answer in rng.sample(created_answers, min(3, len(created_answers))):
+            bookmarks.append(Bookmark(user=user, answer=answer))
+    Bookmark.objects.bulk_create(bookmarks)
+    return created_users
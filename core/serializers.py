@@ -1,7 +1,13 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 from .models import Question, Answer, User, Bookmark
 from taggit.serializers import TagListSerializerField, TaggitSerializer
 from djoser.serializers import UserCreateSerializer as DjoserUserCreateSerializer
+from drf_spectacular.utils import extend_schema_field
+from .duplicates import get_index, find_duplicates
+from .markdown import stored_html, wants_html
+from .media import photo_urls
 
 
 class UserCreateSerializer(DjoserUserCreateSerializer):
@@ -40,7 +46,29 @@ class UserSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class CachedPhotoField(serializers.ImageField):
+    """
+    Read-only image field whose storage URL is memoized per user and photo,
+    since nested authors repeat the same handful of photos across a list.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = photo_urls.get(value)
+        request = self.context.get("request", None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
 class UserNestedSerializer(serializers.ModelSerializer):
+    photo = CachedPhotoField()
+
     class Meta:
         model = User
         fields = [
@@ -50,7 +78,41 @@ class UserNestedSerializer(serializers.ModelSerializer):
         ]
 
 
+class MarkdownField(serializers.CharField):
+    """
+    A Markdown field that, with ?body_format=html, returns the HTML stored
+    next to it when it was saved; see core.markdown.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_length", settings.MARKDOWN_MAX_LENGTH)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if wants_html(self.context.get("request")):
+            return stored_html(
+                getattr(instance, self.source),
+                getattr(instance, f"{self.source}_html"),
+                getattr(instance, f"{self.source}_html_version"),
+            )
+        return super().get_attribute(instance)
+
+
+class SortedTagListField(TagListSerializerField):
+    """
+    Tag names in alphabetical order, as core.fast_lists returns them. Sorted
+    here rather than with the field's order_by, which would bypass the tags
+    prefetched for a list and query once per question.
+    """
+
+    def to_representation(self, value):
+        if not isinstance(value, list):
+            value = sorted(tag.name for tag in value.all())
+        return super().to_representation(value)
+
+
 class AnswerSerializer(serializers.ModelSerializer):
+    text = MarkdownField()
     author = UserNestedSerializer(read_only=True)
     question = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -60,6 +122,7 @@ class AnswerSerializer(serializers.ModelSerializer):
 
 
 class AnswerDetailSerializer(serializers.ModelSerializer):
+    text = MarkdownField()
     author = UserNestedSerializer(read_only=True)
     question = serializers.PrimaryKeyRelatedField(read_only=True)
 
@@ -74,25 +137,67 @@ class AnswerWritableSerializer(serializers.ModelSerializer):
     class Meta:
         model = Answer
         fields = ["text", "author", "accepted"]
+        extra_kwargs = {"text": {"max_length": settings.MARKDOWN_MAX_LENGTH}}
 
 
 class QuestionSerializer(TaggitSerializer, serializers.ModelSerializer):
+    body = MarkdownField(required=False, allow_null=True, allow_blank=True)
     author = UserNestedSerializer(read_only=True)
     answers = AnswerSerializer(many=True, required=False)
-    tags = TagListSerializerField(read_only=True)
+    tags = SortedTagListField(read_only=True)
 
     class Meta:
         model = Question
         fields = ["id", "title", "body", "author", "tags", "answers"]
 
 
+class DuplicateSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    similarity = serializers.FloatField()
+
+
+def index_on_commit(question):
+    """Add ``question`` to the duplicate index once its transaction commits."""
+    pk, title, body = question.pk, question.title, question.body
+    transaction.on_commit(lambda: get_index().add(pk, title, body))
+
+
 class QuestionWritableSerializer(TaggitSerializer, serializers.ModelSerializer):
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    tags = TagListSerializerField(required=False)
+    tags = SortedTagListField(required=False)
+    duplicates = serializers.SerializerMethodField()
 
     class Meta:
         model = Question
-        fields = ["title", "body", "author", "tags"]
+        fields = ["title", "body", "author", "tags", "duplicates"]
+        extra_kwargs = {"body": {"max_length": settings.MARKDOWN_MAX_LENGTH}}
+
+    def create(self, validated_data):
+        # look for duplicates before indexing, so the new question can't match itself
+        duplicates = find_duplicates(
+            validated_data["title"], validated_data.get("body")
+        )
+        question = super().create(validated_data)
+        question.duplicates = duplicates
+        index_on_commit(question)
+        return question
+
+    def update(self, instance, validated_data):
+        question = super().update(instance, validated_data)
+        index_on_commit(question)
+        return question
+
+    @extend_schema_field(DuplicateSerializer(many=True))
+    def get_duplicates(self, obj):
+        if hasattr(obj, "duplicates"):
+            return obj.duplicates
+        return find_duplicates(obj.title, obj.body, exclude=obj.pk)
+
+
+class DuplicateCheckSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=255)
+    body = serializers.CharField(required=False, allow_blank=True, allow_null=True)
 
 
 class QuestionNestedSerializer(serializers.ModelSerializer):
@@ -104,6 +209,7 @@ class QuestionNestedSerializer(serializers.ModelSerializer):
 
 
 class AnswerNestedSerializer(serializers.ModelSerializer):
+    text = MarkdownField()
     author = serializers.SlugRelatedField(slug_field="username", read_only=True)
 
     class Meta:
@@ -150,3 +256,24 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "questions",
             "answers",
         ]
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET"], default="GET")
+    path = serializers.RegexField(r"^/", max_length=2000)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(
+        many=True, allow_empty=False, max_length=settings.BATCH_MAX_REQUESTS
+    )
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    path = serializers.CharField()
+    status = serializers.IntegerField()
+    body = serializers.JSONField()
+
+
+class BatchResultsSerializer(serializers.Serializer):
+    responses = BatchResponseSerializer(many=True)
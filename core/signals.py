@@ -0,0 +1,56 @@
+"""
+Keep search documents in step with questions and their tags. Documents are
+written in the same transaction as the change, so a rollback undoes both.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from .models import Question
+from .search import get_search_backend
+
+
+def tagged_question_ids(tag):
+    return list(
+        Question.tags.through.objects.filter(
+            tag=tag, content_type__app_label="core", content_type__model="question"
+        ).values_list("object_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, raw=False, **kwargs):
+    if not raw:
+        get_search_backend().index([instance.pk])
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def reindex_tagged_questions(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, Question):
+        get_search_backend().index([instance.pk])
+    elif pk_set:
+        get_search_backend().index(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_renamed_tag(sender, instance, created, raw=False, **kwargs):
+    if not (created or raw):
+        get_search_backend().index(tagged_question_ids(instance))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_questions(sender, instance, **kwargs):
+    instance.tagged_question_ids = tagged_question_ids(instance)
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_deleted_tag(sender, instance, **kwargs):
+    get_search_backend().index(getattr(instance, "tagged_question_ids", []))
@@ -0,0 +1,58 @@
+"""
+Shared test setup. Every test module imports ``setUpModule`` from here, so the
+patches below apply to each module's tests, and the API tests derive from
+``APITestCase`` below.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from rest_framework import test
+from rest_framework.throttling import SimpleRateThrottle
+
+from .. import duplicates
+from ..counters import view_counter
+from ..duplicates import DuplicateIndex
+
+NO_THROTTLES = {"anon": None, "user": None, "search": None, "profiles": None}
+
+# seed() sizes for tests checking that query counts don't grow with the data
+SMALL = {"users": 3, "questions": 10, "answers_per_question": 2}
+LARGE = {"users": 10, "questions": 60, "answers_per_question": 5}
+
+
+def setUpModule():
+    # questions saved by any test go to a throwaway duplicate index, not to
+    # the one at DUPLICATE_INDEX_PATH
+    directory = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(directory.cleanup)
+    index_path = os.path.join(directory.name, "duplicate_index.bin")
+    patchers = [
+        mock.patch.object(duplicates, "_index", DuplicateIndex(index_path)),
+        # buffered views are flushed by the tests, not by a thread writing to
+        # the test database in the background
+        mock.patch.object(view_counter, "start"),
+        # no throttling, except in ThrottleTests: counters would otherwise
+        # carry over between tests that reuse the same user ids
+        mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", NO_THROTTLES),
+    ]
+    for patcher in patchers:
+        patcher.start()
+        unittest.addModuleCleanup(patcher.stop)
+
+
+class FreshViewCounter:
+    """
+    Start each test with no buffered views. Question ids are reused between
+    tests, so views left by one test would be counted for another's questions.
+    """
+
+    def setUp(self):
+        super().setUp()
+        view_counter._pending.clear()
+
+
+class APITestCase(FreshViewCounter, test.APITestCase):
+    pass
@@ -0,0 +1,41 @@
+from rest_framework.authtoken.models import Token
+
+from ..accounts import purge_pending
+from ..models import AccountDeletion, Answer, Bookmark, Question, User
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class AccountDeletionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user, self.other = seed(seed=3, users=2, questions=6)[:2]
+        self.user.set_password("secret-password")
+        self.user.save()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_delete_deactivates_then_purge_removes_content(self):
+        owned_questions = Question.objects.filter(author=self.user).count()
+        self.assertGreater(owned_questions, 0)
+
+        response = self.client.delete(
+            "/auth/users/me/", {"current_password": "secret-password"}
+        )
+        self.assertEqual(response.status_code, 204)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(Token.objects.filter(user=self.user).exists())
+        self.assertEqual(
+            Question.objects.filter(author=self.user).count(), owned_questions
+        )
+
+        (deletion,) = purge_pending(batch_size=2)
+        self.assertIsNotNone(deletion.completed_at)
+        self.assertEqual(deletion.questions_deleted, owned_questions)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Question.objects.filter(author_id=self.user.pk).exists())
+        self.assertFalse(Answer.objects.filter(author_id=self.user.pk).exists())
+        self.assertFalse(Bookmark.objects.filter(user_id=self.user.pk).exists())
+        self.assertTrue(User.objects.filter(pk=self.other.pk, is_active=True).exists())
+        self.assertIsNone(AccountDeletion.objects.get().user)
@@ -0,0 +1,46 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Answer, Bookmark, Question, User
+from ..seeding import seed
+from .base import LARGE, SMALL, APITestCase, setUpModule
+
+
+class AdminTests(APITestCase):
+    """Admin pages must not run more queries as the tables grow."""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser("admin", password="admin-password")
+        seed(seed=4, **SMALL)
+        self.client.force_login(self.admin)
+
+    def paths(self):
+        question = Question.objects.first()
+        answer = Answer.objects.first()
+        bookmark = Bookmark.objects.first()
+        return [
+            "/admin/core/user/",
+            "/admin/core/question/",
+            "/admin/core/answer/",
+            "/admin/core/bookmark/",
+            "/admin/core/question/?q=Why",
+            f"/admin/core/question/{question.pk}/change/",
+            f"/admin/core/answer/{answer.pk}/change/",
+            f"/admin/core/bookmark/{bookmark.pk}/change/",
+        ]
+
+    def count_queries(self):
+        counts = {}
+        for path in self.paths():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, f"GET {path}")
+            counts[path] = len(context.captured_queries)
+        return counts
+
+    def test_query_counts_do_not_grow_with_data(self):
+        self.count_queries()  # warm up per-process caches
+        small = self.count_queries()
+        seed(seed=5, **LARGE)
+        self.assertEqual(self.count_queries(), small)
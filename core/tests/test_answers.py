@@ -0,0 +1,72 @@
+import unittest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Answer, Question
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class AnswerThreadTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = seed(seed=13, users=1, questions=1, answers_per_question=4)[0]
+        self.question = Question.objects.get()
+        self.answers = list(self.question.answers.order_by("id"))
+        Answer.objects.update(accepted=None)
+        Answer.objects.filter(pk=self.answers[2].pk).update(accepted=True)
+        Answer.objects.filter(pk=self.answers[0].pk).update(accepted=False)
+        self.client.force_authenticate(self.user)
+        self.path = f"/questions/{self.question.pk}/answers"
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [answer["id"] for answer in response.json()]
+
+    def test_accepted_first_then_incremental(self):
+        first, second, accepted, last = [answer.pk for answer in self.answers]
+        expected = [accepted, first, second, last]
+        for fast in (False, True):
+            with self.subTest(fast=fast), self.settings(FAST_LIST_SERIALIZATION=fast):
+                self.assertEqual(self.ids(self.client.get(self.path)), expected)
+                question = self.client.get(f"/questions/{self.question.pk}").json()
+                self.assertEqual([a["id"] for a in question["answers"]], expected)
+
+        response = self.client.get(self.path, {"after_id": second})
+        self.assertEqual(self.ids(response), [accepted, last])
+        # polling with nothing new is a single query
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.ids(self.client.get(self.path, {"after_id": last})), []
+            )
+        for invalid in ("x", "-1", "99999999999999999999"):
+            response = self.client.get(self.path, {"after_id": invalid})
+            self.assertEqual(response.status_code, 400, invalid)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+    def test_thread_reads_the_thread_index_in_order(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(len(self.ids(self.client.get(self.path))), 4)
+        # the thread is a single query
+        (query,) = context.captured_queries
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("core_answer_thread_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_missing_question(self):
+        path = f"/questions/{self.question.pk + 1}/answers"
+        with self.assertNumQueries(1):
+            response = self.client.get(path, {"after_id": 0})
+            self.assertEqual(response.status_code, 404)
+        # the empty thread, then the question
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(path).status_code, 404)
+        self.assertEqual(self.client.post(path, {"text": "a"}).status_code, 404)
+        response = self.client.post(self.path, {"text": "new"})
+        self.assertEqual(response.status_code, 201)
+        new = Answer.objects.get(text="new")
+        response = self.client.get(self.path, {"after_id": self.answers[-1].pk})
+        self.assertEqual(self.ids(response), [new.pk])
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from ..models import Question
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class BatchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user, self.other = seed(seed=7, users=2, questions=5)[:2]
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_multi_get(self):
+        ids = list(Question.objects.values_list("pk", flat=True)[:3])
+        response = self.client.get("/questions", {"ids": f"{ids[2]},{ids[0]},0"})
+        self.assertEqual([q["id"] for q in response.json()], [ids[0], ids[2]])
+        self.assertEqual(self.client.get("/questions?ids=1,x").status_code, 400)
+
+        usernames = f"{self.other.username},{self.user.username},nobody"
+        response = self.client.get("/profiles", {"usernames": usernames})
+        self.assertEqual(
+            [p["username"] for p in response.json()],
+            sorted([self.user.username, self.other.username]),
+        )
+        self.assertEqual(self.client.get("/profiles").status_code, 400)
+
+    def test_batch_matches_separate_requests(self):
+        question = Question.objects.first()
+        paths = [
+            f"/questions/{question.pk}",
+            "/answers/me",
+            f"/profiles?usernames={self.other.username}",
+            "/questions/0",
+            "/nowhere",
+            "/batch",
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                "/batch",
+                {"requests": [{"path": path} for path in paths]},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        token_lookups = [
+            query for query in context.captured_queries if "authtoken" in query["sql"]
+        ]
+        self.assertEqual(len(token_lookups), 1)
+
+        results = response.json()["responses"]
+        self.assertEqual([r["path"] for r in results], paths)
+        self.assertEqual([r["status"] for r in results], [200, 200, 200, 404, 404, 400])
+        for path, result in zip(paths[:3], results):
+            self.assertEqual(result["body"], self.client.get(path).json())
+
+    def test_batch_uses_sub_request_permissions(self):
+        self.client.credentials()
+        response = self.client.post(
+            "/batch", {"requests": [{"path": "/answers/me"}]}, format="json"
+        )
+        self.assertEqual(response.json()["responses"][0]["status"], 401)
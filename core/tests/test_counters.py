@@ -0,0 +1,78 @@
+import datetime
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..counters import ViewCounter, refresh_hot_scores, upsert_stats
+from ..models import Answer, Question, QuestionStats
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class ViewCounterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        seed(seed=15, users=2, questions=3, answers_per_question=0)
+        self.questions = list(Question.objects.order_by("pk"))
+
+    def views(self):
+        return dict(QuestionStats.objects.values_list("question_id", "views"))
+
+    def test_views_are_batched_then_added(self):
+        counter = ViewCounter(flush_size=3, flush_interval=60)
+        first, second, third = [question.pk for question in self.questions]
+        counter.record(first)
+        counter.record(second)
+        self.assertEqual(self.views(), {})
+        self.assertFalse(counter._full.is_set())
+        counter.record(first)
+        self.assertTrue(counter._full.is_set())
+
+        counter.flush()
+        self.assertEqual(self.views(), {first: 2, second: 1})
+        # deleted questions are skipped, not failed on
+        Question.objects.filter(pk=third).delete()
+        counter.record(first)
+        counter.record(third)
+        counter.flush()
+        self.assertEqual(self.views(), {first: 3, second: 1})
+
+    def test_full_batches_wake_the_flusher(self):
+        counter = ViewCounter(flush_size=2, flush_interval=60)
+        flushed = threading.Event()
+        with (
+            mock.patch.object(counter, "flush", side_effect=flushed.set) as flush,
+            mock.patch("core.counters.close_old_connections"),
+        ):
+            counter.record(self.questions[0].pk)
+            counter.record(self.questions[0].pk)
+            self.assertTrue(flushed.wait(5))
+        flush.assert_called()
+        # nothing left for the thread's next, real flush
+        counter._pending.clear()
+
+    def test_hot_ranking(self):
+        old, popular, answered = self.questions
+        Question.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=3)
+        )
+        Answer.objects.create(text="a", question=answered, author=answered.author)
+        upsert_stats(views={old.pk: 1000, popular.pk: 50})
+        refresh_hot_scores()
+        response = self.client.get("/questions/hot")
+        self.assertEqual(
+            [question["id"] for question in response.json()],
+            [answered.pk, popular.pk, old.pk],
+        )
+
+        # questions that age out of the window drop out of the ranking
+        Question.objects.filter(pk=popular.pk).update(
+            created_at=timezone.now() - settings.HOT_QUESTIONS_WINDOW
+        )
+        refresh_hot_scores()
+        response = self.client.get("/questions/hot")
+        self.assertEqual(
+            [question["id"] for question in response.json()], [answered.pk, old.pk]
+        )
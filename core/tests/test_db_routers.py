@@ -0,0 +1,119 @@
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import TransactionTestCase
+from rest_framework.test import APIRequestFactory
+
+from ..db_routers import REPLICA, PrimaryReplicaRouter
+from ..middleware import SAFE_METHODS, ReplicaRoutingMiddleware
+from ..models import Question, User
+from ..seeding import seed
+from .base import setUpModule
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routing against a second, separate SQLite database as the replica. Reads
+    inside a transaction always use the primary, hence TransactionTestCase.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        replica = connections.configure_settings(
+            {
+                "default": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(directory.name, "replica.sqlite3"),
+                }
+            }
+        )["default"]
+        patcher = mock.patch.dict(connections.settings, {REPLICA: replica})
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        cls.addClassCleanup(connections[REPLICA].close)
+        # the replica only needs the tables the tests read
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(User)
+            editor.create_model(Question)
+        # set here rather than on the class, since the test runner would look
+        # for the alias before it exists
+        cls.databases = {"default", REPLICA}
+        super().setUpClass()
+
+    def setUp(self):
+        self.user = seed(seed=17, users=1, questions=0)[0]
+        self.question = Question.objects.create(title="primary", author=self.user)
+        # flush skips the replica, whose tables aren't migrated; and
+        # bulk_create, so no signals write to the primary
+        with connections[REPLICA].cursor() as cursor:
+            for model in (Question, User):
+                cursor.execute(f"DELETE FROM {model._meta.db_table}")
+        User.objects.using(REPLICA).bulk_create(
+            [User(pk=self.user.pk, username=self.user.username)]
+        )
+        Question.objects.using(REPLICA).bulk_create(
+            [Question(pk=self.question.pk, title="replica", author_id=self.user.pk)]
+        )
+        self.factory = APIRequestFactory()
+
+    def handle(self, request, read_only=False, status=200):
+        """Run ``request`` through the middleware; returns (title read, response)."""
+        titles = []
+
+        def view(request):
+            titles.append(Question.objects.get(pk=self.question.pk).title)
+            if not read_only and request.method not in SAFE_METHODS:
+                Question.objects.filter(pk=self.question.pk).update(title="written")
+            return HttpResponse(status=status)
+
+        def get_response(request):
+            # what Django's handler does between the two middleware hooks
+            middleware.process_view(request, view, (), {})
+            return view(request)
+
+        view.cls = type("View", (), {"read_only": read_only})
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = middleware(request)
+        return titles[0], response
+
+    def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        self.assertEqual(self.handle(self.factory.get("/"))[0], "replica")
+        self.assertEqual(
+            self.handle(self.factory.post("/"), read_only=True)[0], "replica"
+        )
+        # a writing request reads from the primary, and writes there
+        self.assertEqual(self.handle(self.factory.post("/"))[0], "primary")
+        self.assertEqual(Question.objects.get(pk=self.question.pk).title, "written")
+        self.assertEqual(
+            Question.objects.using(REPLICA).get(pk=self.question.pk).title, "replica"
+        )
+        # outside a request, and inside transactions, reads use the primary
+        self.assertEqual(PrimaryReplicaRouter().db_for_read(Question), "default")
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Question), "default")
+
+    def test_successful_writes_pin_reads_to_the_primary(self):
+        _, response = self.handle(self.factory.post("/"), status=400)
+        self.assertFalse(response.has_header(settings.REPLICA_PIN_HEADER))
+
+        _, response = self.handle(self.factory.post("/"), status=201)
+        pin = response[settings.REPLICA_PIN_HEADER]
+        self.assertEqual(response.cookies[settings.REPLICA_PIN_COOKIE].value, pin)
+        for request in (
+            self.factory.get("/", HTTP_X_PRIMARY_UNTIL=pin),
+            self.factory.get("/", HTTP_COOKIE=f"{settings.REPLICA_PIN_COOKIE}={pin}"),
+        ):
+            self.assertEqual(self.handle(request)[0], "written")
+
+        # forged, tampered and expired pins are ignored
+        until = int(time.time()) + 3600
+        signed = ReplicaRoutingMiddleware.signer.sign(str(until - 7200))
+        for forged in (str(until), pin.replace(":", ":0", 1), signed):
+            request = self.factory.get("/", HTTP_X_PRIMARY_UNTIL=forged)
+            self.assertEqual(self.handle(request)[0], "replica")
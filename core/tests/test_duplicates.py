@@ -0,0 +1,109 @@
+import os
+import tempfile
+from unittest import mock
+
+from .. import duplicates
+from ..duplicates import DuplicateIndex, signature, similarity
+from ..models import Question
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+RECORD_SIZE = duplicates._RECORD.size
+
+
+class DuplicateTests(APITestCase):
+    TITLE = "How do I reverse a list in Python without copying it"
+    BODY = "I have a long list of numbers and want to reverse it in place."
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "index.bin")
+        patcher = mock.patch.object(duplicates, "_index", DuplicateIndex(self.path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = seed(seed=18, users=1, questions=0)[0]
+        self.client.force_authenticate(self.user)
+
+    def test_minhash_similarity(self):
+        sig = signature(self.TITLE, self.BODY)
+        self.assertEqual(len(sig), duplicates.NUM_PERM)
+        self.assertEqual(similarity(sig, signature(self.TITLE, self.BODY)), 1)
+        near = signature(self.TITLE + " please", self.BODY)
+        self.assertGreater(similarity(sig, near), 0.7)
+        unrelated = signature("Centering a div with CSS grid", "Nothing works.")
+        self.assertLess(similarity(sig, unrelated), 0.2)
+        self.assertIsNone(signature("", ""))
+
+    def test_lsh_lookup(self):
+        index = DuplicateIndex()
+        index.add(1, self.TITLE, self.BODY)
+        index.add(2, "Centering a div with CSS grid", "Nothing works.")
+        index.add(3, self.TITLE + " quickly", self.BODY)
+        matches = index.query(self.TITLE, self.BODY)
+        self.assertEqual([pk for pk, _ in matches], [1, 3])
+        self.assertEqual(matches[0][1], 1)
+        self.assertEqual(index.query(self.TITLE, self.BODY, exclude=1)[0][0], 3)
+        index.remove(3)
+        self.assertEqual([pk for pk, _ in index.query(self.TITLE, self.BODY)], [1])
+
+    def test_check_duplicate_and_destroy(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/questions", {"title": self.TITLE, "body": self.BODY}
+            )
+        self.assertEqual(response.json()["duplicates"], [])
+        pk = Question.objects.get().pk
+        check = {"title": self.TITLE, "body": self.BODY}
+        response = self.client.post("/questions/check-duplicate", check)
+        self.assertEqual(
+            response.json()["duplicates"],
+            [{"id": pk, "title": self.TITLE, "similarity": 1.0}],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f"/questions/{pk}")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(duplicates.get_index()), 0)
+        # and for other processes, through the file
+        self.assertEqual(DuplicateIndex(self.path).query(self.TITLE, self.BODY), [])
+
+    def test_rolled_back_writes_leave_the_index_alone(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                "/questions", {"title": self.TITLE, "body": self.BODY}
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        # nothing is indexed until the transaction commits
+        self.assertEqual(len(duplicates.get_index()), 0)
+        callbacks[0]()
+        self.assertEqual(len(duplicates.get_index()), 1)
+
+    def test_file_is_compacted(self):
+        index = DuplicateIndex(self.path)
+        with mock.patch.object(duplicates, "COMPACT_MIN_RECORDS", 10):
+            for edit in range(50):
+                index.add(1, f"{self.TITLE} edit {edit}", self.BODY)
+                index.add(2, "Centering a div with CSS grid", f"Take {edit}.")
+        self.assertLessEqual(os.path.getsize(self.path), 10 * RECORD_SIZE)
+        reader = DuplicateIndex(self.path)
+        self.assertEqual(reader.query(f"{self.TITLE} edit 49", self.BODY)[0], (1, 1))
+        self.assertEqual(len(reader), 2)
+
+    def test_rebuild_keeps_concurrent_writes(self):
+        writer = DuplicateIndex(self.path)
+        writer.add(1, "Centering a div with CSS grid", "Nothing works.")
+
+        def rows():
+            yield 2, self.TITLE, self.BODY
+            # written by another process while the rebuild reads the database
+            writer.add(3, self.TITLE + " quickly", self.BODY)
+            writer.remove(2)
+
+        DuplicateIndex(self.path).rebuild(rows())
+        reader = DuplicateIndex(self.path)
+        self.assertEqual([pk for pk, _ in reader.query(self.TITLE, self.BODY)], [3])
+        self.assertEqual(len(reader), 1)
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
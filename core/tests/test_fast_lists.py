@@ -0,0 +1,61 @@
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..counters import refresh_hot_scores
+from ..models import Answer, Question
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class FastListParityTests(APITestCase):
+    """The values() list path must return exactly what the serializers do."""
+
+    def setUp(self):
+        super().setUp()
+        users = seed(seed=6, users=4, questions=12, answers_per_question=3)
+        self.user = users[0]
+        # one author with a photo, so photo URLs are compared too; saved to a
+        # temporary MEDIA_ROOT, not the project's media directory
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.user.photo.save("avatar.png", ContentFile(b"png"), save=True)
+        Answer.objects.filter(pk=Answer.objects.first().pk).update(accepted=True)
+        # rendered by an older renderer, so the HTML is rendered on read
+        Question.objects.filter(pk=Question.objects.first().pk).update(
+            body="*old* <b>", body_html_version=0
+        )
+        refresh_hot_scores()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, fast):
+        with self.settings(FAST_LIST_SERIALIZATION=fast):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, f"GET {path}")
+        return response.json(), len(context.captured_queries)
+
+    def test_responses_match_serializers(self):
+        question = Question.objects.filter(answers__isnull=False).first()
+        paths = [
+            "/questions",
+            "/questions?page_size=5&page=2",
+            "/questions/me",
+            "/questions/hot",
+            f"/questions/{question.pk}/answers",
+            "/answers/me",
+            "/questions?body_format=html",
+            f"/questions/{question.pk}/answers?body_format=html",
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                slow, slow_queries = self.get(path, fast=False)
+                fast, fast_queries = self.get(path, fast=True)
+                self.assertTrue(slow)
+                self.assertEqual(fast, slow)
+                self.assertLessEqual(fast_queries, slow_queries)
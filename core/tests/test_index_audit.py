@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.authtoken.models import Token
+
+from ..models import Question
+from .base import APITestCase, setUpModule
+
+
+class IndexAuditTests(APITestCase):
+    def test_every_read_route_runs_clean(self):
+        out = StringIO()
+        call_command("index_audit", questions=40, users=5, answers=2, stdout=out)
+        output = out.getvalue()
+        self.assertIn("\n0 statement(s) flagged", output)
+        # routes come from the URLconf, with the multi-get and poll variants
+        for route in (
+            "GET /auth/users/",
+            "?ids=",
+            "/profiles?usernames=",
+            "?after_id=",
+        ):
+            self.assertIn(route, output)
+        self.assertIn("POST /batch -> 200", output)
+        # the seeded data is rolled back
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(Token.objects.exists())
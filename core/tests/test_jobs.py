@@ -0,0 +1,107 @@
+import datetime
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ..jobs import claim, job, run
+from ..models import Job
+from .base import APITestCase, setUpModule
+
+calls = []
+
+
+@job(max_attempts=2)
+def record_call(value, fail=False):
+    calls.append(value)
+    if fail:
+        raise RuntimeError("failed on purpose")
+
+
+@job
+def abandon_job(pk):
+    # as if job ``pk`` was claimed a moment ago by a worker that then died
+    now = timezone.now()
+    Job.objects.filter(pk=pk).update(status=Job.RUNNING, started_at=now, run_after=now)
+    time.sleep(0.6)
+
+
+class JobTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+
+    def run_due(self):
+        return [run(pk) for pk in claim(10)]
+
+    def test_job_is_queued_on_commit_and_run(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            record_call.delay(value=1)
+            self.assertFalse(Job.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        self.assertEqual(self.run_due(), [Job.DONE])
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.run_due(), [])
+
+    def test_failed_job_is_retried_with_backoff_then_given_up(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            record_call.delay(value=1, fail=True)
+
+        with self.assertLogs("core.jobs", "WARNING"):
+            self.assertEqual(self.run_due(), [Job.QUEUED])
+        job = Job.objects.get()
+        self.assertIn("failed on purpose", job.last_error)
+        self.assertEqual(self.run_due(), [], "retry should wait for run_after")
+
+        Job.objects.update(run_after=job.created_at)
+        with self.assertLogs("core.jobs", "ERROR"):
+            self.assertEqual(self.run_due(), [Job.FAILED])
+        self.assertEqual(calls, [1, 1])
+
+    def test_email_is_sent_by_the_worker(self):
+        with self.settings(
+            EMAIL_BACKEND="core.email.QueuedEmailBackend",
+            QUEUED_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                mail.send_mail("Activate", "Welcome", "qb@example.com", ["a@b.c"])
+            self.assertEqual(mail.outbox, [])
+            self.assertEqual(self.run_due(), [Job.DONE])
+        self.assertEqual(mail.outbox[0].subject, "Activate")
+
+
+class WorkerTests(TransactionTestCase):
+    # jobs run in the worker's threads, which only see committed rows
+    def queue(self, func, **kwargs):
+        return Job.objects.create(
+            name=func.job_name,
+            kwargs=kwargs,
+            max_attempts=func.max_attempts,
+            run_after=timezone.now(),
+        )
+
+    @override_settings(
+        JOBS_STALE_AFTER=datetime.timedelta(seconds=0.5),
+        JOBS_REQUEUE_INTERVAL=0,
+        JOBS_POLL_INTERVAL=0.01,
+    )
+    def test_jobs_abandoned_after_startup_are_requeued(self):
+        calls.clear()
+        # not due, so only abandon_job touches it
+        abandoned = self.queue(record_call, value=1)
+        Job.objects.filter(pk=abandoned.pk).update(
+            run_after=timezone.now() + datetime.timedelta(days=1)
+        )
+        abandoning = self.queue(abandon_job, pk=abandoned.pk)
+        # the worker's SIGTERM and SIGINT handlers would outlive the test
+        with mock.patch("signal.signal"):
+            call_command("run_worker", "--burst", stdout=StringIO())
+        self.assertEqual(Job.objects.get(pk=abandoning.pk).status, Job.DONE)
+        self.assertEqual(Job.objects.get(pk=abandoned.pk).status, Job.DONE)
+        self.assertIn(1, calls)
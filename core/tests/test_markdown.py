@@ -0,0 +1,71 @@
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+
+from .. import markdown
+from ..models import Answer, Question
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class MarkdownTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = seed(seed=12, users=1, questions=0)[0]
+
+    def test_render_escapes_before_formatting(self):
+        self.assertEqual(
+            markdown.render("**Hi** <script>x</script> `a<b` [t](javascript:x)"),
+            "<p><strong>Hi</strong> &lt;script&gt;x&lt;/script&gt; "
+            "<code>a&lt;b</code> [t](javascript:x)</p>",
+        )
+        self.assertEqual(
+            markdown.render('# T\n\n- a\n- [b](https://e.com/?q=1&x="y")'),
+            "<h1>T</h1>\n<ul>\n<li>a</li>\n"
+            '<li><a href="https://e.com/?q=1&amp;x=&quot;y&quot;" '
+            'rel="nofollow noopener">b</a></li>\n</ul>',
+        )
+
+    def test_hostile_sources_render_quickly(self):
+        # unclosed delimiters used to backtrack quadratically
+        for source in ("*a " * 32000, "~~a " * 32000):
+            start = time.perf_counter()
+            self.assertEqual(markdown.render(source), f"<p>{source.strip()}</p>")
+            self.assertLess(time.perf_counter() - start, 5)
+        # nesting past MAX_NESTING is left as text rather than recursing
+        quoted = markdown.render("> " * 2000)
+        self.assertEqual(quoted.count("<blockquote>"), markdown.MAX_NESTING)
+        self.assertIn("&gt; &gt;", quoted)
+        listed = markdown.render("- " * 2000 + "x")
+        self.assertEqual(listed.count("<ul>"), markdown.MAX_NESTING)
+
+    def test_long_sources_are_rejected(self):
+        self.client.force_authenticate(self.user)
+        body = "a" * (settings.MARKDOWN_MAX_LENGTH + 1)
+        response = self.client.post("/questions", {"title": "t", "body": body})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("body", response.json())
+
+    def test_html_is_rendered_on_save_and_rerendered_by_version(self):
+        question = Question.objects.create(title="t", body="*a*", author=self.user)
+        answer = Answer.objects.create(text="_b_", question=question, author=self.user)
+        self.assertEqual(question.body_html, "<p><em>a</em></p>")
+        question.body = "**c**"
+        question.save(update_fields=["body"])
+        question.refresh_from_db()
+        self.assertEqual(question.body_html, "<p><strong>c</strong></p>")
+
+        response = self.client.get(f"/questions/{question.pk}?body_format=html")
+        self.assertEqual(response.json()["body"], "<p><strong>c</strong></p>")
+        self.assertEqual(response.json()["answers"][0]["text"], "<p><em>b</em></p>")
+        self.assertEqual(
+            self.client.get(f"/questions/{question.pk}").json()["body"], "**c**"
+        )
+
+        Answer.objects.update(text_html="stale", text_html_version=0)
+        call_command("rerender_markdown", processes=1, stdout=StringIO())
+        answer.refresh_from_db()
+        self.assertEqual(answer.text_html, "<p><em>b</em></p>")
+        self.assertEqual(answer.text_html_version, markdown.RENDERER_VERSION)
@@ -0,0 +1,77 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.http import Http404
+from rest_framework.test import APIRequestFactory
+
+from ..media import MediaURLCache, media_urlpatterns, photo_urls, serve_media
+from ..seeding import seed
+from ..serializers import CachedPhotoField, UserNestedSerializer
+from .base import APITestCase, setUpModule
+
+
+class MediaTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        Path(self.media_root.name, "photo.png").write_bytes(b"png")
+        self.factory = APIRequestFactory()
+
+    def test_route_needs_debug_or_an_offloading_server(self):
+        for overrides, served in [
+            ({}, False),
+            ({"DEBUG": True}, True),
+            ({"MEDIA_USE_SENDFILE": True}, True),
+            ({"MEDIA_ACCEL_REDIRECT_PREFIX": "/protected/"}, True),
+            ({"DEBUG": True, "USE_S3": True}, False),
+        ]:
+            with self.subTest(**overrides), self.settings(**overrides):
+                self.assertEqual(bool(media_urlpatterns()), served)
+
+    def test_serve_media(self):
+        request = self.factory.get("/media/photo.png")
+        with self.settings(MEDIA_ROOT=self.media_root.name):
+            response = serve_media(request, "photo.png")
+            self.assertEqual(b"".join(response.streaming_content), b"png")
+            with self.settings(MEDIA_ACCEL_REDIRECT_PREFIX="/protected/"):
+                response = serve_media(request, "a/../photo.png")
+                self.assertEqual(response["X-Accel-Redirect"], "/protected/photo.png")
+                self.assertEqual(response["Content-Type"], "image/png")
+                self.assertEqual(response.content, b"")
+            with self.assertRaises(Http404):
+                serve_media(request, "../../etc/passwd")
+
+    def test_url_cache(self):
+        signatures = iter(range(100))
+        storage = mock.Mock()
+        storage.url.side_effect = lambda name: f"https://cdn/{name}?{next(signatures)}"
+        cache = MediaURLCache(maxsize=2, ttl=60)
+        with mock.patch("core.media.time.monotonic", return_value=1000):
+            first = cache.url(1, "a.png", storage)
+            self.assertEqual(cache.url(1, "a.png", storage), first)
+            # a new upload has a new name, so a new URL
+            self.assertNotEqual(cache.url(1, "b.png", storage), first)
+            # the least recently used entry is evicted
+            cache.url(2, "c.png", storage)
+            self.assertEqual(storage.url.call_count, 3)
+            cache.url(1, "a.png", storage)
+            self.assertEqual(storage.url.call_count, 4)
+        with mock.patch("core.media.time.monotonic", return_value=1061):
+            # expired, so not handed out close to a signed URL's own expiry
+            self.assertEqual(cache.url(2, "c.png", storage), "https://cdn/c.png?4")
+
+    def test_cached_photo_field(self):
+        user = seed(seed=20, users=1, questions=0)[0]
+        field = CachedPhotoField()
+        self.assertIsNone(field.to_representation(user.photo))
+        user.photo.name = "user_profile_photos/a.png"
+        with mock.patch.object(photo_urls, "url", return_value="/media/a.png") as url:
+            self.assertEqual(field.to_representation(user.photo), "/media/a.png")
+            context = {"request": self.factory.get("/")}
+            self.assertEqual(
+                UserNestedSerializer(user, context=context).data["photo"],
+                "http://testserver/media/a.png",
+            )
+        url.assert_called_with(user.pk, "user_profile_photos/a.png", user.photo.storage)
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from ..models import Question
+from ..pagination import estimate_count
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+@override_settings(ESTIMATED_COUNT_THRESHOLD=0)
+class EstimatedCountTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        seed(seed=19, users=2, questions=12, answers_per_question=0)
+
+    def page(self, number, estimate):
+        with mock.patch("core.pagination.estimate_count", return_value=estimate):
+            response = self.client.get("/questions", {"page_size": 5, "page": number})
+        return response.status_code, response.json()
+
+    def summary(self, number, estimate):
+        status, data = self.page(number, estimate)
+        if status != 200:
+            return status
+        return (
+            len(data["results"]),
+            data["count"],
+            data["count_is_approximate"],
+            data["next"] is not None,
+        )
+
+    def test_estimate_below_the_real_count(self):
+        self.assertEqual(self.summary(1, 4), (5, 12, False, True))
+        self.assertEqual(self.summary(2, 7), (5, 12, False, True))
+        # past the estimated end, on a real page
+        self.assertEqual(self.summary(3, 7), (2, 12, False, False))
+        self.assertEqual(self.summary(4, 7), 404)
+
+    def test_estimate_above_the_real_count(self):
+        self.assertEqual(self.summary(1, 100), (5, 100, True, True))
+        # the short last page gives the count away
+        self.assertEqual(self.summary(3, 100), (2, 12, False, False))
+        self.assertEqual(self.summary(4, 100), 404)
+
+    def test_exact_count_matches_unestimated(self):
+        _, estimated = self.page(2, 11)
+        self.assertEqual(estimated["results"], self.page(2, None)[1]["results"])
+
+    def test_postgres_estimates(self):
+        cursor = mock.MagicMock()
+        database = mock.MagicMock(vendor="postgresql")
+        database.cursor.return_value.__enter__.return_value = cursor
+        databases = mock.MagicMock()
+        databases.__getitem__.return_value = database
+        with mock.patch("core.pagination.connections", databases):
+            # unfiltered: the table's reltuples
+            cursor.fetchone.return_value = (12345.0,)
+            self.assertEqual(estimate_count(Question.objects.all()), 12345)
+            self.assertIn("reltuples", cursor.execute.call_args.args[0])
+            cursor.fetchone.return_value = (-1.0,)
+            self.assertIsNone(estimate_count(Question.objects.all()))
+
+            # filtered: the planner's row estimate
+            cursor.fetchone.return_value = ('[{"Plan": {"Plan Rows": 42}}]',)
+            self.assertEqual(estimate_count(Question.objects.filter(pk__gt=1)), 42)
+            self.assertTrue(cursor.execute.call_args.args[0].startswith("EXPLAIN"))
+        self.assertIsNone(estimate_count(Question.objects.all()))
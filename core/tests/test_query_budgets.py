@@ -0,0 +1,169 @@
+import time
+import unittest
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.authtoken.models import Token
+
+from ..models import Answer, Question, User
+from ..seeding import seed
+from .base import LARGE, SMALL, APITestCase, setUpModule
+
+
+class Budget(NamedTuple):
+    queries: int
+    milliseconds: float
+
+
+# Budgets for every read route in project/urls.py, keyed by URL name. Each
+# route is checked at two data sizes: the query count must not grow with the
+# data, and must stay within budget. The authenticated request's token lookup
+# counts as one query. Response times are only checked with TIME_BUDGETS on,
+# since they depend on the machine.
+BUDGETS = {
+    "question-list": Budget(queries=4, milliseconds=400),
+    # ?search= and ?ids= on question-list
+    "question-search": Budget(queries=4, milliseconds=200),
+    "question-multi-get": Budget(queries=4, milliseconds=100),
+    "question-detail": Budget(queries=4, milliseconds=100),
+    "question-me": Budget(queries=4, milliseconds=200),
+    "question-hot": Budget(queries=4, milliseconds=200),
+    "answer-list": Budget(queries=3, milliseconds=100),
+    "answer-detail": Budget(queries=2, milliseconds=100),
+    "my-answers": Budget(queries=2, milliseconds=200),
+    "bookmarks-list": Budget(queries=2, milliseconds=100),
+    "profile-detail": Budget(queries=4, milliseconds=200),
+    "profile-list": Budget(queries=4, milliseconds=200),
+    "user-list": Budget(queries=2, milliseconds=100),
+    "user-detail": Budget(queries=2, milliseconds=100),
+    "user-me": Budget(queries=2, milliseconds=100),
+}
+
+
+# Routes without a read budget: writes only, or served without the database.
+UNBUDGETED = {
+    "question-check-duplicate",
+    "answer-accept",
+    "batch",
+    "schema",
+    "swagger-ui",
+    "media",
+    "api-root",
+    "user-activation",
+    "user-resend-activation",
+    "user-reset-password",
+    "user-reset-password-confirm",
+    "user-reset-username",
+    "user-reset-username-confirm",
+    "user-set-password",
+    "user-set-username",
+}
+
+
+def route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+        elif isinstance(pattern, URLResolver) and not pattern.app_name:
+            # descend into our router's routes, not into third-party url modules
+            if isinstance(pattern.urlconf_name, (list, tuple)):
+                yield from route_names(pattern.url_patterns)
+
+
+class QueryBudgetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.user = seed(seed=1, **SMALL)[0]
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def grow(self):
+        seed(seed=2, authors=[self.user], **LARGE)
+
+    def paths(self):
+        question = Question.objects.filter(author=self.user).first()
+        answer = Answer.objects.filter(question=question).first()
+        ids = ",".join(str(pk) for pk in Question.objects.values_list("pk", flat=True))
+        usernames = ",".join(User.objects.values_list("username", flat=True)[:20])
+        return {
+            "question-list": "/questions",
+            "question-search": "/questions?search=django",
+            "question-multi-get": f"/questions?ids={ids}",
+            "question-detail": f"/questions/{question.pk}",
+            "question-me": "/questions/me",
+            "question-hot": "/questions/hot",
+            "answer-list": f"/questions/{question.pk}/answers",
+            "answer-detail": f"/answers/{answer.pk}/",
+            "my-answers": "/answers/me",
+            "bookmarks-list": "/bookmarks/",
+            "profile-detail": f"/profiles/{self.user.username}",
+            "profile-list": f"/profiles?usernames={usernames}",
+            "user-list": "/auth/users/",
+            "user-detail": f"/auth/users/{self.user.pk}/",
+            "user-me": "/auth/users/me/",
+        }
+
+    def measure(self, path):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, f"GET {path}")
+        return context.captured_queries
+
+    def time(self, path):
+        """The fastest of three requests, in milliseconds."""
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            response = self.client.get(path)
+            timings.append((time.perf_counter() - start) * 1000)
+            self.assertEqual(response.status_code, 200, f"GET {path}")
+        return min(timings)
+
+    def format_queries(self, queries):
+        return "\n".join(f"  {i}. {query['sql']}" for i, query in enumerate(queries, 1))
+
+    def test_every_route_has_a_budget(self):
+        names = set(route_names(get_resolver().url_patterns))
+        missing = names - set(BUDGETS) - UNBUDGETED
+        self.assertFalse(missing, f"Routes without a query budget: {sorted(missing)}")
+
+    def test_routes_stay_within_budget(self):
+        small = {name: self.measure(path) for name, path in self.paths().items()}
+        self.grow()
+        for name, path in self.paths().items():
+            budget = BUDGETS[name]
+            queries = self.measure(path)
+            with self.subTest(route=name):
+                self.assertLessEqual(
+                    len(queries),
+                    budget.queries,
+                    f"GET {path} ran {len(queries)} queries, budget is "
+                    f"{budget.queries}:\n{self.format_queries(queries)}",
+                )
+                self.assertEqual(
+                    len(queries),
+                    len(small[name]),
+                    f"GET {path} ran {len(small[name])} queries on the small "
+                    f"data set and {len(queries)} on the large one:\n"
+                    f"{self.format_queries(queries)}",
+                )
+
+    @unittest.skipUnless(
+        settings.TIME_BUDGETS, "set TIME_BUDGETS=true to check response times"
+    )
+    def test_routes_stay_within_time_budget(self):
+        self.grow()
+        for name, path in self.paths().items():
+            budget = BUDGETS[name]
+            elapsed = self.time(path)
+            with self.subTest(route=name):
+                self.assertLessEqual(
+                    elapsed,
+                    budget.milliseconds,
+                    f"GET {path} took {elapsed:.0f} ms, budget is "
+                    f"{budget.milliseconds:.0f} ms",
+                )
@@ -0,0 +1,76 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import brotli
+import msgpack
+
+from django.test import override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from ..models import User
+from ..renderers import ORJSONParser, ORJSONRenderer
+from ..seeding import seed
+from .base import APITestCase, setUpModule
+
+
+class RendererTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = seed(seed=14, users=1, questions=20)[0]
+
+    def test_json_round_trip(self):
+        data = {
+            "text": "ünïcode ✓",
+            "price": Decimal("1.50"),
+            "when": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "label": gettext_lazy("lazy"),
+            1: [None, True, 2.5],
+        }
+        # the same document DRF's own renderer writes
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(rendered)),
+            json.loads(JSONRenderer().render(data)),
+        )
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b"{"))
+
+    def test_msgpack_is_negotiated(self):
+        response = self.client.get("/questions", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(
+            msgpack.unpackb(response.content), self.client.get("/questions").json()
+        )
+
+    def test_content_encoding_is_negotiated(self):
+        expected = self.client.get("/questions").content
+        decoders = {"br": brotli.decompress, "gzip": gzip.decompress}
+        for accept, encoding in [
+            ("gzip, br;q=0.9", "br"),
+            ("gzip", "gzip"),
+            ("identity", None),
+        ]:
+            response = self.client.get("/questions", HTTP_ACCEPT_ENCODING=accept)
+            self.assertEqual(response.get("Content-Encoding"), encoding)
+            self.assertIn("Accept-Encoding", response["Vary"])
+            decode = decoders.get(encoding, lambda content: content)
+            self.assertEqual(decode(response.content), expected)
+
+    @override_settings(COMPRESSION_MIN_SIZE=0)
+    def test_token_responses_are_not_compressed(self):
+        User.objects.create_user(username="login", password="secret-password")
+        with mock.patch("core.middleware.gzip.compress") as compress:
+            response = self.client.post(
+                "/auth/token/login/",
+                {"username": "login", "password": "secret-password"},
+                HTTP_ACCEPT_ENCODING="gzip",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("auth_token", response.json())
+        compress.assert_not_called()
@@ -0,0 +1,60 @@
+import gzip
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import override_settings
+
+from .. import schema
+from .base import APITestCase, setUpModule
+
+
+class SchemaTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        artifact_dir = override_settings(SCHEMA_ARTIFACT_DIR=self.directory)
+        artifact_dir.enable()
+        self.addCleanup(artifact_dir.disable)
+        patcher = mock.patch.dict(schema._artifacts, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_formats_and_conditional_requests(self):
+        # a missing schema isn't remembered once it has been built
+        self.assertEqual(self.client.get("/schema/").status_code, 404)
+        manifest = schema.build_artifacts(self.directory)
+
+        for kwargs, fmt in [
+            ({}, "yaml"),
+            ({"data": {"format": "json"}}, "json"),
+            ({"HTTP_ACCEPT": "application/json"}, "json"),
+        ]:
+            response = self.client.get("/schema/", **kwargs)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], schema.FORMATS[fmt])
+            self.assertEqual(response["ETag"], f'"{manifest[fmt]}"')
+            body = (self.directory / f"schema.{fmt}").read_bytes()
+            self.assertEqual(response.content, body)
+
+        response = self.client.get("/schema/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(response.content),
+            (self.directory / "schema.yaml").read_bytes(),
+        )
+
+        etag = f'"{manifest["yaml"]}"'
+        for header, status in [
+            (etag, 304),
+            (f"W/{etag}", 304),
+            (f'"other", {etag}', 304),
+            ("*", 304),
+            ('"other"', 200),
+            (f'"{manifest["yaml"]}x"', 200),
+        ]:
+            with self.subTest(if_none_match=header):
+                response = self.client.get("/schema/", HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, status)
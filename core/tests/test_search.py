@@ -0,0 +1,74 @@
+from unittest import mock
+
+from ..models import Question, User
+from ..search import SubstringSearchBackend, get_search_backend
+from .base import APITestCase, setUpModule
+
+
+class SearchTests(APITestCase):
+    """The contract every backend in core.search has to meet."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("searcher", password="search-password")
+        self.client.force_authenticate(self.user)
+
+    def ask(self, title, body="", tags=()):
+        response = self.client.post(
+            "/questions", {"title": title, "body": body, "tags": list(tags)}
+        )
+        self.assertEqual(response.status_code, 201)
+        return Question.objects.latest("id")
+
+    def search(self, text):
+        response = self.client.get("/questions", {"search": text})
+        self.assertEqual(response.status_code, 200)
+        return [question["id"] for question in response.json()]
+
+    def test_ranking_and_matching(self):
+        in_body = self.ask("Unrelated words", "how to migrate a database")
+        in_title = self.ask("Migrating a database", "nothing else")
+        in_tags = self.ask("Another question", "about a database", tags=["migrations"])
+        self.ask("Only a database here")
+
+        # stemmed, every term required, title over tags over body
+        self.assertEqual(
+            self.search("migrations database"), [in_title.pk, in_tags.pk, in_body.pk]
+        )
+        self.assertEqual(
+            self.search("migrate!! (database)"), self.search("migrate database")
+        )
+        self.assertEqual(self.search('"NEAR OR'), [])
+        self.assertEqual(len(self.search("")), 4)
+
+    def test_index_follows_edits_tags_and_deletes(self):
+        question = self.ask("Caching question", tags=["redis"])
+        self.assertEqual(self.search("caching"), [question.pk])
+
+        question.title = "Renamed question"
+        question.save()
+        self.assertEqual(self.search("caching"), [])
+
+        question.tags.set(["memcached"])
+        self.assertEqual(self.search("redis"), [])
+        self.assertEqual(self.search("memcached"), [question.pk])
+
+        tag = question.tags.get()
+        tag.name = "valkey"
+        tag.save()
+        self.assertEqual(self.search("valkey"), [question.pk])
+
+        question.delete()
+        self.assertEqual(self.search("renamed"), [])
+
+    @mock.patch("core.search._backend", None)
+    @mock.patch.dict("core.search.BACKENDS", clear=True)
+    def test_other_databases_fall_back_to_substring_matching(self):
+        with self.assertLogs("core.search", "WARNING"):
+            first = self.ask("Migrating a database", tags=["django"])
+        second = self.ask("Another question", "about a database")
+        self.assertIsInstance(get_search_backend(), SubstringSearchBackend)
+
+        self.assertEqual(self.search("DATABASE"), [first.pk, second.pk])
+        self.assertEqual(self.search("django migrat"), [first.pk])
+        self.assertEqual(self.search("migrations"), [])
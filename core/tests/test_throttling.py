@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+from ..seeding import seed
+from ..throttling import CounterRateThrottle
+from .base import APITestCase, setUpModule
+
+
+class ThrottleTests(APITestCase):
+    RATES = {"anon": "3/min", "user": "5/min", "search": "2/min", "profiles": None}
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        for patcher in (
+            mock.patch.object(SimpleRateThrottle, "THROTTLE_RATES", self.RATES),
+            mock.patch.object(CounterRateThrottle, "timer", mock.Mock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.clock = CounterRateThrottle.timer
+        self.clock.return_value = 6000.0
+        self.user = seed(seed=16, users=1, questions=1)[0]
+
+    def statuses(self, count, path="/questions"):
+        return [self.client.get(path).status_code for _ in range(count)]
+
+    def test_limit_and_retry_after(self):
+        self.assertEqual(self.statuses(4), [200, 200, 200, 429])
+        self.clock.return_value += 20
+        response = self.client.get("/questions")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "40")
+
+    def test_budget_resets_with_the_window(self):
+        self.assertEqual(self.statuses(4), [200, 200, 200, 429])
+        self.clock.return_value += 60
+        self.assertEqual(self.statuses(4), [200, 200, 200, 429])
+
+    def test_budgets_are_per_client_and_route(self):
+        self.assertEqual(self.statuses(4), [200, 200, 200, 429])
+        # users have their own, larger budget
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.statuses(6), [200] * 5 + [429])
+
+        # searches also count against the search budget
+        self.client.force_authenticate(None)
+        caches["default"].clear()
+        self.assertEqual(self.statuses(3, "/questions?search=x"), [200, 200, 429])
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        statuses = [
+            self.client.get(
+                "/questions", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}"
+            ).status_code
+            for i in range(4)
+        ]
+        self.assertEqual(statuses, [200, 200, 200, 429])
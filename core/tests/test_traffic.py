@@ -0,0 +1,59 @@
+import glob
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase, override_settings
+
+from ..models import Question
+from ..seeding import seed
+from .base import FreshViewCounter, setUpModule
+
+
+class TrafficReplayTests(FreshViewCounter, LiveServerTestCase):
+    def setUp(self):
+        super().setUp()
+        seed(seed=11, users=1, questions=3)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "requests.jsonl")
+
+    def test_recorded_requests_are_replayed(self):
+        question = Question.objects.first()
+        with override_settings(TRAFFIC_RECORD_RATE=1, TRAFFIC_RECORD_PATH=self.path):
+            self.client.get("/questions", {"page_size": 2})
+            self.client.get(f"/questions/{question.pk}")
+            self.client.post(
+                "/auth/token/login",
+                {"username": "someone", "password": "hunter2"},
+                content_type="application/json",
+            )
+            self.client.get("/nowhere")
+
+        files = glob.glob(self.path.replace(".jsonl", "-*.jsonl"))
+        with open(files[0]) as lines:
+            records = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [(r["method"], r["route"], r["status"]) for r in records],
+            [
+                ("GET", "question-list", 200),
+                ("GET", "question-detail", 200),
+                ("POST", "login", 400),
+                ("GET", None, 404),
+            ],
+        )
+        self.assertEqual(records[0]["query"], {"page_size": "2"})
+        self.assertEqual(
+            records[2]["body"], {"username": "someone", "password": "[redacted]"}
+        )
+
+        out = StringIO()
+        call_command(
+            "replay", files[0], base_url=self.live_server_url, speed=0, stdout=out
+        )
+        report = out.getvalue()
+        self.assertRegex(report, r"GET question-list +1 ")
+        self.assertRegex(report, r"POST login +1 ")
+        self.assertRegex(report, r"all +4 .* 0\.0% ")
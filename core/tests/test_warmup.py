@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from rest_framework.settings import api_settings
+
+from ..warmup import warm_up
+from .base import setUpModule
+
+
+class StartupTests(SimpleTestCase):
+    def test_warm_up(self):
+        warm_up()
+        # DRF's settings classes were resolved, not left for the first request
+        self.assertIn("DEFAULT_RENDERER_CLASSES", api_settings._cached_attrs)
+
+    def test_profile_startup(self):
+        out = StringIO()
+        call_command("profile_startup", top=5, stdout=out)
+        output = out.getvalue()
+        self.assertIn("url conf", output)
+        self.assertIn("Top 5 imports by cumulative cost:", output)
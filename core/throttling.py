@@ -0,0 +1,111 @@
+"""
+Request throttling backed by atomic counters in the shared cache.
+
+DRF's built-in throttles keep a list of request timestamps per client, which
+costs a read and a write per request and races between workers. These keep
+one counter per client per time window instead, bumped with the cache's
+atomic incr(), so concurrent workers never lose a request.
+"""
+
+from django.core.cache import caches
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class CounterRateThrottle(SimpleRateThrottle):
+    """
+    Fixed-window rate limit: at most ``num_requests`` per ``duration`` for each
+    cache key. Subclasses decide who shares a budget via ``get_cache_key``.
+    """
+
+    cache = caches["default"]
+
+    def increment(self, key):
+        # incr() is atomic on Redis and Memcached; the window's counter is
+        # created, with its expiry, by the first request in it
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # add() loses to a concurrent first request
+            if self.cache.add(key, 1, self.duration):
+                return 1
+            return self.cache.incr(key)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        count = self.increment(f"{self.key}:{window}")
+        return count <= self.num_requests
+
+    def wait(self):
+        return max(self.window_end - self.now, 1)
+
+
+class AnonThrottle(CounterRateThrottle):
+    """Per-IP budget for unauthenticated clients."""
+
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class UserThrottle(CounterRateThrottle):
+    """Per-user budget for authenticated clients."""
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+
+class RouteThrottle(CounterRateThrottle):
+    """
+    Separate budget for expensive routes. Views opt in by setting
+    ``throttle_scope``; a ``?search=`` on a searchable view always uses the
+    "search" scope.
+    """
+
+    def __init__(self):
+        # the scope, and so the rate, is only known once we see the view
+        pass
+
+    def get_scope(self, request, view):
+        searchable = any(
+            issubclass(backend, SearchFilter)
+            for backend in getattr(view, "filter_backends", [])
+        )
+        if searchable and request.query_params.get(api_settings.SEARCH_PARAM):
+            return "search"
+        return getattr(view, "throttle_scope", None)
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,5 +1,13 @@
 from .models import Question, Answer, User, Bookmark
-from django.db import IntegrityError
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, Prefetch
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from rest_framework import viewsets, serializers
 from rest_framework.generics import (
     get_object_or_404,
@@ -9,13 +17,13 @@ from rest_framework.generics import (
     ListCreateAPIView,
     RetrieveAPIView,
 )
-from rest_framework.exceptions import PermissionDenied, ParseError
+from rest_framework.exceptions import NotFound, PermissionDenied, ParseError
 from rest_framework.parsers import JSONParser, FileUploadParser
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework import status, permissions, filters
+from rest_framework.views import APIView
+from rest_framework import status, permissions
 from djoser.views import UserViewSet as DjoserUserViewSet
-from djoser.conf import settings
 
 from .serializers import (
     QuestionSerializer,
@@ -28,20 +36,109 @@ from .serializers import (
     BookmarkListSerializer,
     BookmarkCreateSerializer,
     UserProfileSerializer,
+    DuplicateCheckSerializer,
+    BatchSerializer,
+    BatchResultsSerializer,
 )
+from .duplicates import get_index, find_duplicates
 from .custom_permissions import IsAuthorOrReadOnly
+from .pagination import EstimatedCountPagination
+from .counters import view_counter, hot_questions
+from .accounts import request_deletion
+from .fast_lists import AnswerRows, QuestionRows
+from .markdown import BODY_FORMAT_PARAM, wants_html
+from .search import FullTextSearchFilter
+
+
+def list_param(request, name, cast=str):
+    """
+    The values of a comma-separated query parameter such as ?ids=1,2,3, or
+    None when it's absent. At most MULTI_GET_MAX values are accepted.
+    """
+    raw = request.query_params.get(name)
+    if raw is None:
+        return None
+    try:
+        values = [cast(value.strip()) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise ParseError(f"{name} must be a comma-separated list.")
+    if len(values) > settings.MULTI_GET_MAX:
+        raise ParseError(f"At most {settings.MULTI_GET_MAX} {name} per request.")
+    return values
+
+
+class FastListMixin:
+    """
+    With FAST_LIST_SERIALIZATION on, list responses are built from values()
+    rows by ``row_serializer_class`` instead of by serializing model instances.
+    The JSON is the same either way.
+    """
+
+    row_serializer_class = None
+
+    def get_row_serializer(self):
+        return self.row_serializer_class(html=wants_html(self.request))
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        row_serializer = self.get_row_serializer()
+        rows = row_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.build(page, request))
+        return Response(row_serializer.build(rows, request))
+
+    def list_data(self, queryset):
+        """Serialized data for an unpaginated list."""
+        if settings.FAST_LIST_SERIALIZATION:
+            row_serializer = self.get_row_serializer()
+            return row_serializer.build(row_serializer.values(queryset), self.request)
+        return self.get_serializer(queryset, many=True).data
+
+
+body_format = OpenApiParameter(
+    BODY_FORMAT_PARAM,
+    OpenApiTypes.STR,
+    enum=["markdown", "html"],
+    description="html returns question bodies and answer texts as sanitized "
+    "HTML instead of Markdown.",
+)
 
 
-class QuestionViewSet(viewsets.ModelViewSet):
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "ids",
+                OpenApiTypes.STR,
+                description="Comma-separated question ids to fetch, e.g. 1,2,3",
+            ),
+            body_format,
+        ]
+    ),
+    retrieve=extend_schema(parameters=[body_format]),
+    hot=extend_schema(parameters=[body_format]),
+    me=extend_schema(parameters=[body_format]),
+)
+class QuestionViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     Handle retrieve, create, edit, and destroy for questions.
-    Allow full-text search on title, body, and tags via ?search=term.
+    Allow full-text search on title, body, and tags via ?search=term, with the
+    best matches first; see core.search.
+    Creating or editing a question reports likely near-duplicates; POST to
+    /questions/check-duplicate to run the same check without saving.
+    Lists are paginated when ?page_size= is given, and ?ids=1,2,3 fetches
+    several questions at once. ?body_format=html returns bodies and answer
+    texts as HTML rendered when they were saved.
+    GET /questions/hot lists the currently hot questions.
     """
 
-    queryset = Question.objects.all()
+    queryset = Question.objects.order_by("id")
     serializer_class = QuestionSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ["@title", "@body", "@tags__name"]
+    row_serializer_class = QuestionRows
+    pagination_class = EstimatedCountPagination
+    filter_backends = [FullTextSearchFilter]
     permission_classes = [IsAuthorOrReadOnly]
 
     def get_serializer_class(self):
@@ -52,6 +149,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
             "update": QuestionWritableSerializer,
             "partial_update": QuestionWritableSerializer,
             "destroy": QuestionWritableSerializer,
+            "check_duplicate": DuplicateCheckSerializer,
         }
 
         try:
@@ -59,22 +157,133 @@ class QuestionViewSet(viewsets.ModelViewSet):
         except (KeyError, AttributeError):
             return super().get_serializer_class()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in permissions.SAFE_METHODS:
+            # load everything QuestionSerializer nests in a fixed number of queries
+            queryset = queryset.select_related("author").prefetch_related(
+                "tags",
+                Prefetch(
+                    "answers",
+                    # question first, so the prefetch reads the thread index
+                    # in order instead of sorting every page's answers
+                    queryset=Answer.objects.select_related("author").order_by(
+                        "question_id", *Answer.THREAD_ORDER
+                    ),
+                ),
+            )
+        if self.action == "list":
+            ids = list_param(self.request, "ids", int)
+            if ids is not None:
+                queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        view_counter.record(int(kwargs["pk"]))
+        return response
+
+    @action(detail=False, methods=["get"])
+    def hot(self, request):
+        return Response(self.list_data(hot_questions(self.get_queryset())))
+
+    def perform_destroy(self, instance):
+        pk = instance.pk
+        super().perform_destroy(instance)
+        transaction.on_commit(lambda: get_index().remove(pk))
+
+    @action(detail=False, methods=["post"], url_path="check-duplicate")
+    def check_duplicate(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        duplicates = find_duplicates(
+            serializer.validated_data["title"], serializer.validated_data.get("body")
+        )
+        return Response({"duplicates": duplicates})
+
     @action(detail=False, methods=["get"])
     def me(self, request):
         if self.request.user.is_anonymous:
             content = {"reason": "You are not logged in"}
             return Response(content, status=status.HTTP_403_FORBIDDEN)
-        serializer = self.get_serializer(request.user.questions.all(), many=True)
-        return Response(serializer.data)
+        return Response(self.list_data(self.get_queryset().filter(author=request.user)))
+
 
+@extend_schema_view(
+    list=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "after_id",
+                OpenApiTypes.INT,
+                description="Only list answers added after the answer with this id.",
+            ),
+            body_format,
+        ]
+    ),
+    retrieve=extend_schema(parameters=[body_format]),
+)
+class AnswerViewSet(FastListMixin, viewsets.ModelViewSet):
+    """
+    Handle list and create for the answers to a question. The accepted answer
+    comes first, then the rest oldest first. ?after_id= lists only answers
+    added after that one, so clients can poll for new answers.
+    """
 
-class AnswerViewSet(viewsets.ModelViewSet):
     serializer_class = AnswerSerializer
+    row_serializer_class = AnswerRows
 
     def get_queryset(self):
-        question_id = self.kwargs.get("question_id")
-        question = get_object_or_404(Question, pk=question_id)
-        return Answer.objects.filter(question=question)
+        queryset = Answer.objects.select_related("author").order_by(
+            *Answer.THREAD_ORDER
+        )
+        queryset = queryset.filter(question_id=self.kwargs["question_id"])
+        after_id = self.after_id()
+        if self.action == "list" and after_id is not None:
+            # only for polls: a range on id keeps SQLite from reading the
+            # thread index in order
+            queryset = queryset.filter(id__gt=after_id)
+            if not self.has_answers(queryset):
+                queryset = queryset.none()
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # an empty thread, or no question at all; polls have checked already
+        if not response.data and self.after_id() is None:
+            if not Question.objects.filter(pk=self.kwargs["question_id"]).exists():
+                raise NotFound("No Question matches the given query.")
+        return response
+
+    def after_id(self):
+        """The ?after_id= of a poll, or None for the whole thread."""
+        after_id = self.request.query_params.get("after_id")
+        if after_id is None:
+            return None
+        _, high = connection.ops.integer_field_range(
+            Answer._meta.pk.get_internal_type()
+        )
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise ParseError("after_id must be an answer id.")
+        if not 0 <= after_id <= high:
+            raise ParseError(f"after_id must be between 0 and {high}.")
+        return after_id
+
+    def has_answers(self, answers):
+        """
+        Whether a poll has ``answers`` to list, looked up in the same query as
+        the question, so polling with nothing new is one query. Raises
+        NotFound if the question doesn't exist.
+        """
+        found = list(
+            Question.objects.filter(pk=self.kwargs["question_id"])
+            .annotate(has_answers=Exists(answers))
+            .values_list("has_answers", flat=True)
+        )
+        if not found:
+            raise NotFound("No Question matches the given query.")
+        return found[0]
 
     def get_serializer_class(self):
         serializer_class_by_action = {
@@ -92,20 +301,29 @@ class AnswerViewSet(viewsets.ModelViewSet):
             return super().get_serializer_class()
 
     def perform_create(self, serializer):
-        question = get_object_or_404(Question, pk=self.kwargs["question_id"])
-        serializer.save(question=question)
+        question_id = self.kwargs["question_id"]
+        if not Question.objects.filter(pk=question_id).exists():
+            raise NotFound("No Question matches the given query.")
+        serializer.save(question_id=question_id)
 
 
-class AnswerListView(ListAPIView):
+@extend_schema_view(get=extend_schema(parameters=[body_format]))
+class AnswerListView(FastListMixin, ListAPIView):
     serializer_class = AnswerSerializer
+    row_serializer_class = AnswerRows
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Answer.objects.filter(author=self.request.user)
+        return (
+            Answer.objects.filter(author=self.request.user)
+            .select_related("author")
+            .order_by("id")
+        )
 
 
+@extend_schema_view(get=extend_schema(parameters=[body_format]))
 class AnswerDetailView(RetrieveUpdateDestroyAPIView):
-    queryset = Answer.objects.all()
+    queryset = Answer.objects.select_related("author")
     serializer_class = AnswerDetailSerializer
     permission_classes = [IsAuthorOrReadOnly]
 
@@ -137,7 +355,11 @@ class BookmarkListCreateView(ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Bookmark.objects.filter(user=self.request.user)
+        return (
+            Bookmark.objects.filter(user=self.request.user)
+            .select_related("question__author", "answer__author")
+            .order_by("id")
+        )
 
     def get_serializer(self, *args, **kwargs):
         if self.request.method == "POST":
@@ -155,11 +377,122 @@ class BookmarkListCreateView(ListCreateAPIView):
             )
 
 
+profiles = User.objects.filter(is_active=True).prefetch_related(
+    Prefetch("questions", queryset=Question.objects.select_related("author")),
+    Prefetch("answers", queryset=Answer.objects.select_related("author")),
+)
+
+
 class ProfileDetailView(RetrieveAPIView):
     """
     Handle GET for user profiles.
     """
 
-    queryset = User.objects.all()
+    queryset = profiles
     serializer_class = UserProfileSerializer
     lookup_field = "username"
+    throttle_scope = "profiles"
+
+
+@extend_schema_view(
+    get=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "usernames",
+                OpenApiTypes.STR,
+                required=True,
+                description="Comma-separated usernames, e.g. ann,bob",
+            )
+        ]
+    )
+)
+class ProfileListView(ListAPIView):
+    """
+    Handle GET for several profiles at once: /profiles?usernames=ann,bob.
+    """
+
+    serializer_class = UserProfileSerializer
+    throttle_scope = "profiles"
+
+    def get_queryset(self):
+        usernames = list_param(self.request, "usernames")
+        if not usernames:
+            raise ParseError("usernames is required.")
+        return profiles.filter(username__in=usernames).order_by("username")
+
+
+class BatchView(APIView):
+    """
+    Run several GET requests in one round trip. POST /batch with
+    {"requests": [{"path": "/questions/1"}, {"path": "/profiles?usernames=ann"}]}
+    returns {"responses": [{"path", "status", "body"}, ...]} in request order.
+    Sub-requests run in this request, sharing its authentication and
+    database connection, and go through their views' own permission checks
+    and throttles.
+    """
+
+    # only reads, so the replica router may serve it despite being a POST
+    read_only = True
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(request=BatchSerializer, responses=BatchResultsSerializer)
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            {
+                "responses": [
+                    self.run(request, item["path"])
+                    for item in serializer.validated_data["requests"]
+                ]
+            }
+        )
+
+    def run(self, request, path):
+        url = urlsplit(path)
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return {"path": path, "status": 404, "body": {"detail": "Not found."}}
+        view_class = getattr(match.func, "cls", None)
+        if not (view_class and issubclass(view_class, APIView)) or issubclass(
+            view_class, BatchView
+        ):
+            return {
+                "path": path,
+                "status": 400,
+                "body": {"detail": "Only API routes can be batched."},
+            }
+
+        sub_request = HttpRequest()
+        sub_request.method = "GET"
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.META = {
+            **{
+                key: value
+                for key, value in request.META.items()
+                if key not in ("CONTENT_LENGTH", "CONTENT_TYPE")
+            },
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+        }
+        sub_request.GET = QueryDict(url.query)
+        sub_request.COOKIES = request.COOKIES
+        sub_request.resolver_match = match
+        # authenticated once, for the whole batch; see core.authentication
+        sub_request.batch = request
+
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        return {"path": path, "status": response.status_code, "body": response.data}
+
+
+class UserViewSet(DjoserUserViewSet):
+    """
+    Djoser's /auth/users endpoints, except that deleting an account only
+    deactivates it. Its content is removed in the background by
+    `manage.py purge_deleted_accounts`.
+    """
+
+    def perform_destroy(self, instance):
+        request_deletion(instance)
@@ -0,0 +1,47 @@
+"""
+Boot-time warm-up, so the first request a fresh machine serves doesn't pay
+for imports and one-off setup.
+
+With gunicorn's ``preload_app`` this runs once in the master before workers
+fork, and the workers inherit the warmed-up modules.
+"""
+
+from django.core.files.storage import storages
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework.settings import api_settings
+
+from .schema import FORMATS, load_artifact
+
+
+def warm_up():
+    # import every view, serializer and permission module behind the URL conf
+    get_resolver().url_patterns
+
+    # DRF resolves these dotted paths on first use
+    for setting in (
+        "DEFAULT_RENDERER_CLASSES",
+        "DEFAULT_PARSER_CLASSES",
+        "DEFAULT_AUTHENTICATION_CLASSES",
+        "DEFAULT_PERMISSION_CLASSES",
+        "DEFAULT_THROTTLE_CLASSES",
+    ):
+        getattr(api_settings, setting)
+
+    # instantiating the storage backend imports boto3 when USE_S3 is on
+    storages["default"]
+
+    for fmt in FORMATS:
+        load_artifact(fmt)
+
+    # never hand a database connection opened here to forked workers
+    connections.close_all()
+
+
+def connect_databases():
+    """
+    Open database connections before the first request needs them. They're
+    kept for CONN_MAX_AGE seconds, so the first requests reuse them.
+    """
+    for connection in connections.all():
+        connection.ensure_connection()
@@ -0,0 +1,19 @@
+# Gunicorn reads this file automatically when started from the project root.
+import os
+
+bind = f":{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# Import and warm up the app once in the master (see project/wsgi.py), so
+# forked workers start ready to serve instead of each paying for imports.
+preload_app = True
+
+
+def post_worker_init(worker):
+    # connect to the database before the first request arrives
+    from core.warmup import connect_databases
+
+    try:
+        connect_databases()
+    except Exception:
+        worker.log.exception("Could not connect to the database at worker start")
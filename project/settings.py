@@ -11,17 +11,18 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 from corsheaders.defaults import default_headers
 import environ
-import sentry_sdk
-from sentry_sdk.integrations.django import DjangoIntegration
 
 env = environ.Env(
     # set casting, default value
     DEBUG=(bool, False),
     USE_S3=(bool, False),
     USE_SENTRY=(bool, False),
+    WARM_UP_ON_BOOT=(bool, True),
 )
 environ.Env.read_env()
 
@@ -65,7 +66,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.TrafficRecorderMiddleware",
+    "core.middleware.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -98,6 +102,27 @@ WSGI_APPLICATION = "project.wsgi.application"
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
 DATABASES = {"default": env.db()}
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# check a reused connection is still alive before each request's first query
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Optional read replica. Safe-method requests read from it unless the client
+# wrote within the last REPLICA_PIN_SECONDS; see core.middleware.
+if env("REPLICA_DATABASE_URL", default=None):
+    DATABASES["replica"] = env.db("REPLICA_DATABASE_URL")
+    DATABASES["replica"]["CONN_MAX_AGE"] = DATABASES["default"]["CONN_MAX_AGE"]
+    DATABASES["replica"]["CONN_HEALTH_CHECKS"] = True
+    # tests read "replica" through the default connection
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["core.db_routers.PrimaryReplicaRouter"]
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+REPLICA_PIN_COOKIE = "qb_primary_until"
+REPLICA_PIN_HEADER = "X-Primary-Until"
+
+# Shared cache for throttle counters. Use redis:// or memcached:// in production,
+# since the default local-memory cache is per process.
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
 
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
@@ -157,22 +182,103 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly"
     ],
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("core.authentication.TokenAuthentication",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        *(["core.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "core.throttling.AnonThrottle",
+        "core.throttling.UserThrottle",
+        "core.throttling.RouteThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": env("THROTTLE_RATE_ANON", default="60/min"),
+        "user": env("THROTTLE_RATE_USER", default="120/min"),
+        "search": env("THROTTLE_RATE_SEARCH", default="20/min"),
+        "profiles": env("THROTTLE_RATE_PROFILES", default="30/min"),
+    },
+    # 0 identifies clients by REMOTE_ADDR and ignores X-Forwarded-For, which
+    # clients can forge; fly.toml sets the number of proxies in front of us
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
 }
 
+# Response compression, see core.middleware.CompressionMiddleware
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# djoser's token login; responses carrying secrets are never compressed
+COMPRESSION_EXCLUDED_URL_NAMES = ["login"]
+
+# View counting and hot questions, see core.counters
+VIEW_COUNTER_FLUSH_SIZE = env.int("VIEW_COUNTER_FLUSH_SIZE", default=200)
+VIEW_COUNTER_FLUSH_INTERVAL = env.int("VIEW_COUNTER_FLUSH_INTERVAL", default=30)
+HOT_QUESTIONS_WINDOW = timedelta(days=7)
+HOT_QUESTIONS_REFRESH_INTERVAL = timedelta(minutes=5)
+HOT_QUESTIONS_GRAVITY = 1.5
+HOT_QUESTIONS_LIMIT = 30
+
+# Above this many rows, paginators report the planner's estimate instead of
+# COUNT(*); see core.pagination
+ESTIMATED_COUNT_THRESHOLD = env.int("ESTIMATED_COUNT_THRESHOLD", default=10000)
+
+# Most ids or usernames in one multi-get (?ids=, ?usernames=), and most
+# sub-requests in one POST /batch
+MULTI_GET_MAX = 100
+BATCH_MAX_REQUESTS = 25
+
+# Have the test suite also hold read routes to their response-time budgets
+# (see core/tests/test_query_budgets.py); off by default, since timings vary
+# between machines
+TIME_BUDGETS = env.bool("TIME_BUDGETS", default=False)
+
+# Longest question body or answer text accepted, in characters; see core.markdown
+MARKDOWN_MAX_LENGTH = 30000
+
+# Build question and answer lists from values() rows; see core.fast_lists
+FAST_LIST_SERIALIZATION = env.bool("FAST_LIST_SERIALIZATION", default=False)
+
+# Share of requests recorded for `manage.py replay` (0 turns recording off);
+# see core.middleware.TrafficRecorderMiddleware
+TRAFFIC_RECORD_RATE = env.float("TRAFFIC_RECORD_RATE", default=0)
+TRAFFIC_RECORD_PATH = env(
+    "TRAFFIC_RECORD_PATH", default=str(BASE_DIR / "traffic/requests.jsonl")
+)
+TRAFFIC_RECORD_MAX_BYTES = env.int("TRAFFIC_RECORD_MAX_BYTES", default=50 * 1024 * 1024)
+TRAFFIC_RECORD_BACKUP_COUNT = env.int("TRAFFIC_RECORD_BACKUP_COUNT", default=10)
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "content-disposition",
+    "x-primary-until",
 ]
+CORS_EXPOSE_HEADERS = ["X-Primary-Until"]
 
 MEDIA_URL = "/media/"
 MEDIA_DIR = BASE_DIR / "media"
+MEDIA_ROOT = MEDIA_DIR
+# Local media is served by core.media.serve_media: with DEBUG on, or when the
+# web server sends the files. Behind nginx, set MEDIA_ACCEL_REDIRECT_PREFIX to
+# an internal location aliased to MEDIA_ROOT; behind Apache or lighttpd, set
+# MEDIA_USE_SENDFILE.
+MEDIA_ACCEL_REDIRECT_PREFIX = env("MEDIA_ACCEL_REDIRECT_PREFIX", default="")
+MEDIA_USE_SENDFILE = env.bool("MEDIA_USE_SENDFILE", default=False)
+MEDIA_CACHE_MAX_AGE = 86400
+# Memoized photo URLs in nested serializers. Keep the TTL well under
+# AWS_QUERYSTRING_EXPIRE if S3 URLs are signed.
+MEDIA_URL_CACHE_SIZE = 10000
+MEDIA_URL_CACHE_TTL = 600
 
 # AWS Config
-if env("USE_S3"):
+USE_S3 = env("USE_S3")
+if USE_S3:
     AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY")
     AWS_STORAGE_BUCKET_NAME = env("AWS_STORAGE_BUCKET_NAME")
@@ -199,6 +305,8 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.0",
     "SWAGGER_UI_DIST": "//unpkg.com/swagger-ui-dist@5.7.1",
 }
+# Built by manage.py build_schema; see core.schema
+SCHEMA_ARTIFACT_DIR = BASE_DIR / "schema"
 
 DJOSER = {
     "SERIALIZERS": {
@@ -209,9 +317,47 @@ DJOSER = {
 }
 
 TAGGIT_CASE_INSENSITIVE = True
+
+# Near-duplicate question detection
+DUPLICATE_INDEX_PATH = env(
+    "DUPLICATE_INDEX_PATH", default=str(BASE_DIR / "duplicate_index.bin")
+)
+DUPLICATE_THRESHOLD = env.float("DUPLICATE_THRESHOLD", default=0.5)
+DUPLICATE_MAX_RESULTS = 5
 APPEND_SLASH = False
 
+# Full-text search for ?search=; by default the backend for the database
+# vendor, see core.search
+SEARCH_BACKEND = env("SEARCH_BACKEND", default=None)
+
+# Background jobs; see core.jobs
+JOBS_CONCURRENCY = env.int("JOBS_CONCURRENCY", default=4)
+JOBS_POOL = env("JOBS_POOL", default="thread")
+JOBS_POLL_INTERVAL = 1
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+JOBS_STALE_AFTER = timedelta(hours=1)
+# how often a worker looks for jobs abandoned by dead workers, in seconds
+JOBS_REQUEUE_INTERVAL = 60
+
+# Email is queued as jobs and sent by the worker through QUEUED_EMAIL_BACKEND
+EMAIL_BACKEND = "core.email.QueuedEmailBackend"
+QUEUED_EMAIL_BACKEND = env(
+    "EMAIL_BACKEND", default="django.core.mail.backends.smtp.EmailBackend"
+)
+
+# Deleted accounts are purged this many rows per transaction; see core.accounts
+ACCOUNT_PURGE_BATCH_SIZE = env.int("ACCOUNT_PURGE_BATCH_SIZE", default=500)
+
+# Run first-request work (URL conf, serializers, storage backend) at boot,
+# in the gunicorn master when preloading; see core.warmup.
+WARM_UP_ON_BOOT = env("WARM_UP_ON_BOOT")
+
 if env("USE_SENTRY"):
+    # imported here so instances without Sentry don't pay for it at boot
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+
     sentry_sdk.init(
         dsn=env("SENTRY_DSN"),
         integrations=[DjangoIntegration(signals_spans=False)],
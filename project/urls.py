@@ -15,10 +15,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import include, path
 from rest_framework import routers
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from core.views import (
     QuestionViewSet,
     AnswerViewSet,
@@ -27,11 +26,21 @@ from core.views import (
     AnswerAcceptView,
     BookmarkListCreateView,
     ProfileDetailView,
+    ProfileListView,
+    BatchView,
+    UserViewSet,
 )
+from core.schema import schema_view
+from core.media import media_urlpatterns
+
 
 router = routers.DefaultRouter(trailing_slash=False)
 router.register("questions", QuestionViewSet)
 
+# djoser's user routes, with our account deletion
+auth_router = routers.DefaultRouter()
+auth_router.register("users", UserViewSet)
+
 urlpatterns = [
     path("", include(router.urls)),
     path(
@@ -44,11 +53,13 @@ urlpatterns = [
     path("answers/<int:pk>/", AnswerDetailView.as_view(), name="answer-detail"),
     path("bookmarks/", BookmarkListCreateView.as_view(), name="bookmarks-list"),
     path("admin/", admin.site.urls),
-    path("auth/", include("djoser.urls")),
+    path("auth/", include(auth_router.urls)),
     path("auth/", include("djoser.urls.authtoken")),
     path("api-auth/", include("rest_framework.urls")),
+    path("profiles", ProfileListView.as_view(), name="profile-list"),
     path("profiles/<str:username>", ProfileDetailView.as_view(), name="profile-detail"),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("batch", BatchView.as_view(), name="batch"),
+    path("schema/", schema_view, name="schema"),
     path(
         "docs/",
         SpectacularSwaggerView.as_view(
@@ -56,4 +67,6 @@ urlpatterns = [
         ),
         name="swagger-ui",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+urlpatterns += media_urlpatterns()